@@ -0,0 +1,68 @@
+from chilly import EDGES_ONCE, find_eggs, find_exit, find_player
+from chilly.cache import load_graph
+from chilly.batch import BatchWalker
+from chilly.streams import BlockRandom
+
+# Define the grid
+data = [
+    "OY T    $ Y$Y",
+    " X          Y",
+    "  T # T   $O ",
+    " T       T  T",
+    "#Y   #  TT# T",
+    "Y T $    Y ##",
+    "      Y T $  ",
+    "TT   Y  Y#Y T",
+    " $ #    # $T ",
+    "  $ # Y   T  ",
+    "T    T     P#",
+    "  Y $  Y T  Y"
+]
+
+# Mapping for wormhole destinations
+wormhole_mapping = {
+    '(0, 0)': '(2, 11)',
+    '(2, 11)': '(0, 0)'
+}
+
+##################
+# Create the graph
+##################
+# Built on the first run, then loaded from the graph cache (see chilly/cache.py)
+compiled_graph = load_graph(data, wormhole_mapping)
+print(compiled_graph)
+
+start_node = find_player(data)
+end_node = find_exit(data)
+print(f"Start {start_node} to exit {end_node}")
+
+# Find the egg positions
+egg_nodes = find_eggs(data)
+print(f"Eggs: {egg_nodes}")
+
+print("###############################")
+print("Batched Brute Force Monte Carlo")
+print("###############################")
+
+num_walkers = 4096  # Number of independent walkers moved in lockstep
+steps_per_check = 1000  # Number of batch steps between the progress reports
+minimum_steps = 70  # Number of minimal steps to take
+seed = None  # Seed of the random stream, None draws a fresh one (printed, set it here to repeat the run)
+rng = BlockRandom(seed)
+print("Seed:", rng.seed)
+
+walkers = BatchWalker(compiled_graph, num_walkers, rule=EDGES_ONCE, minimum_steps=minimum_steps,
+                      rng=rng.generator)
+
+solutions = []
+while not solutions:
+    solutions = walkers.run(steps_per_check)
+    print(f"step {walkers.steps}: {walkers.steps * num_walkers} attempted moves, "
+          f"mean depth {walkers.depth.mean():.1f}, max depth {walkers.depth.max()}")
+
+# Print the results of all walkers that reached the exit in the same step
+for solution in solutions:
+    result_path = compiled_graph.nodes_of(solution.edges)
+    print("Walker", solution.walker, "path taken:", compiled_graph.labels_of(result_path),
+          " with length: ", len(solution.edges))
+    print(len(solution.edges), "steps:", compiled_graph.edge_directions(solution.edges))
@@ -0,0 +1,19 @@
+from chilly import EDGES_ONCE
+from chilly.benchmark import scaling_benchmark
+
+print("###########################################")
+print("Scaling Benchmark on random playfields")
+print("###########################################")
+
+sizes = (8, 16, 32, 64, 128, 200)  # Square playfields of growing size
+moves = 100000  # Number of moves timed for the move rate
+solution_moves = 1000000  # Move budget for the first solution
+
+print(f"{'size':>8} {'walker':>20} {'nodes':>7} {'edges':>7} {'build s':>9} {'moves/s':>10} "
+      f"{'first s':>9} {'build MB':>9} {'walk MB':>9}")
+for result in scaling_benchmark(sizes, rule=EDGES_ONCE, obstacle_density=0.2, eggs=4, wormholes=2, seed=0,
+                                moves=moves, solution_moves=solution_moves):
+    first_solution = '-' if result.first_solution_seconds is None else f"{result.first_solution_seconds:.3f}"
+    print(f"{result.size:>8} {result.walker:>20} {result.nodes:>7} {result.edges:>7} {result.build_seconds:>9.3f} "
+          f"{result.moves_per_second:>10.0f} {first_solution:>9} {result.build_memory_mb:>9.1f} "
+          f"{result.walk_memory_mb:>9.1f}", flush=True)
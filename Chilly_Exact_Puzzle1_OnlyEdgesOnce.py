@@ -0,0 +1,52 @@
+from chilly import EDGES_ONCE, find_eggs, find_exit, find_player
+from chilly.cache import load_graph
+from chilly.exact import longest_path
+
+# Define the grid
+data = [
+    "###YY#T#",
+    "X $YO$ P",
+    "T      T",
+    "Y   T  Y",
+    "TO    TY",
+    "#T$    #",
+    "Y  T$ OT",
+    "YTY#TT##"
+]
+
+# Mapping for wormhole destinations
+wormhole_mapping = {
+    '(4, 1)': '(1, 4)',
+    '(1, 4)': '(6, 6)',
+    '(6, 6)': '(4, 1)'
+}
+
+##################
+# Create the graph
+##################
+# Built on the first run, then loaded from the graph cache (see chilly/cache.py)
+compiled_graph = load_graph(data, wormhole_mapping)
+print(compiled_graph)
+
+start_node = find_player(data)
+end_node = find_exit(data)
+print(f"Start {start_node} to exit {end_node}")
+
+# Find the egg positions
+egg_nodes = find_eggs(data)
+print(f"Eggs: {egg_nodes}")
+
+print("###########################################")
+print("Exact Branch and Bound")
+print("###########################################")
+
+# Enumerate all paths with pruning, the result is the proven longest solution
+result = longest_path(compiled_graph, rule=EDGES_ONCE)
+print("Search tree size:", result.search_nodes, " proven:", result.proven)
+
+if result.length is None:
+    print("No solution exists")
+else:
+    result_path = compiled_graph.nodes_of(result.edges)
+    print("Path taken:", compiled_graph.labels_of(result_path), " with length: ", result.length)
+    print(result.length, "steps:", compiled_graph.edge_directions(result.edges))
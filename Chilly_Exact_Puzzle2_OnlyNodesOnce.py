@@ -0,0 +1,55 @@
+from chilly import NODES_ONCE, find_eggs, find_exit, find_player
+from chilly.cache import load_graph
+from chilly.exact import longest_path
+
+# Define the grid
+data = [
+    "OY #    $ Y$Y",
+    " X          Y",
+    "  T # T   $O ",
+    " T       T  T",
+    "#Y   #  TT# #",
+    "Y T $    Y ##",
+    "      Y T $  ",
+    "TT   Y  Y#Y T",
+    " $ #    # $  ",
+    "  $ # Y   T  ",
+    "T    T     P#",
+    "  Y $  Y T  Y"
+]
+
+# Mapping for wormhole destinations
+wormhole_mapping = {
+    '(0, 0)': '(2, 11)',
+    '(2, 11)': '(0, 0)'
+}
+
+##################
+# Create the graph
+##################
+# Built on the first run, then loaded from the graph cache (see chilly/cache.py)
+compiled_graph = load_graph(data, wormhole_mapping)
+print(compiled_graph)
+
+start_node = find_player(data)
+end_node = find_exit(data)
+print(f"Start {start_node} to exit {end_node}")
+
+# Find the egg positions
+egg_nodes = find_eggs(data)
+print(f"Eggs: {egg_nodes}")
+
+print("###########################################")
+print("Exact Branch and Bound")
+print("###########################################")
+
+# Enumerate all paths with pruning, the result is the proven longest solution
+result = longest_path(compiled_graph, rule=NODES_ONCE)
+print("Search tree size:", result.search_nodes, " proven:", result.proven)
+
+if result.length is None:
+    print("No solution exists")
+else:
+    result_path = compiled_graph.nodes_of(result.edges)
+    print("Path taken:", compiled_graph.labels_of(result_path), " with length: ", result.length)
+    print(result.length, "steps:", compiled_graph.edge_directions(result.edges))
@@ -0,0 +1,64 @@
+from chilly import EDGES_ONCE, find_eggs, find_exit, find_player
+from chilly.cache import load_graph
+from chilly.exit_guided import exit_guided_walk
+from chilly.streams import BlockRandom
+
+# Define the grid
+data = [
+    "OY T    $ Y$Y",
+    " X          Y",
+    "  T # T   $O ",
+    " T       T  T",
+    "#Y   #  TT# T",
+    "Y T $    Y ##",
+    "      Y T $  ",
+    "TT   Y  Y#Y T",
+    " $ #    # $T ",
+    "  $ # Y   T  ",
+    "T    T     P#",
+    "  Y $  Y T  Y"
+]
+
+# Mapping for wormhole destinations
+wormhole_mapping = {
+    '(0, 0)': '(2, 11)',
+    '(2, 11)': '(0, 0)'
+}
+
+##################
+# Create the graph
+##################
+# Built on the first run, then loaded from the graph cache (see chilly/cache.py)
+compiled_graph = load_graph(data, wormhole_mapping)
+print(compiled_graph)
+
+start_node = find_player(data)
+end_node = find_exit(data)
+print(f"Start {start_node} to exit {end_node}")
+
+# Find the egg positions
+egg_nodes = find_eggs(data)
+print(f"Eggs: {egg_nodes}")
+
+print("###########################################")
+print("Exit Guided Monte Carlo")
+print("###########################################")
+
+minimum_steps = 70  # Number of minimal steps to take
+seed = None  # Seed of the random stream, None draws a fresh one (printed, set it here to repeat the run)
+rng = BlockRandom(seed)
+print("Seed:", rng.seed)
+
+# Every splice move completes the current path by the shortest free route to the exit
+# and scores it, invkT > 0 favours the longer paths, prune_dead never enters a prefix that
+# cannot collect all eggs anymore
+result_path, all_traversed_nodes, result_edges = next(exit_guided_walk(compiled_graph, minimum_steps, rule=EDGES_ONCE,
+                                                                       splice_probability=0.1, invkT=0.2, prune_dead=True,
+                                                                       rng=rng))
+
+# Translate the node ids back to the ('row', columns') strings
+result_path_labels = compiled_graph.labels_of(result_path)
+
+# Print the result
+print("Path taken:", result_path_labels, " with length: ", len(result_path)-1)
+print(len(result_edges), "steps:", compiled_graph.edge_directions(result_edges))
@@ -0,0 +1,59 @@
+from chilly import EDGES_ONCE, find_eggs, find_exit, find_player
+from chilly.cache import load_graph
+from chilly.parallel import parallel_search
+
+# Define the grid
+data = [
+    "OY T    $ Y$Y",
+    " X          Y",
+    "  T # T   $O ",
+    " T       T  T",
+    "#Y   #  TT# T",
+    "Y T $    Y ##",
+    "      Y T $  ",
+    "TT   Y  Y#Y T",
+    " $ #    # $T ",
+    "  $ # Y   T  ",
+    "T    T     P#",
+    "  Y $  Y T  Y"
+]
+
+# Mapping for wormhole destinations
+wormhole_mapping = {
+    '(0, 0)': '(2, 11)',
+    '(2, 11)': '(0, 0)'
+}
+
+# The workers are started as new processes, so only run the search in the main script
+if __name__ == '__main__':
+    ##################
+    # Create the graph
+    ##################
+    # Built on the first run, then loaded from the graph cache (see chilly/cache.py)
+    compiled_graph = load_graph(data, wormhole_mapping)
+    print(compiled_graph)
+
+    start_node = find_player(data)
+    end_node = find_exit(data)
+    egg_nodes = find_eggs(data)
+    print(f"Start {start_node} to exit {end_node}")
+    print(f"Eggs: {egg_nodes}")
+
+    print("################################")
+    print("Parallel Brute Force Monte Carlo")
+    print("################################")
+
+    sampler = 'brute_force'  # 'brute_force', 'umbrella' or 'ibi'
+    minimum_steps = 60  # Number of minimal steps to take
+    target_steps = 77  # Stop all workers once a path of that length is found
+    time_budget = 600  # Stop all workers after that many seconds
+    master_seed = 2025  # Every worker draws from its own jumped PCG64 stream of it
+
+    solutions = parallel_search(compiled_graph, sampler, minimum_steps=minimum_steps, rule=EDGES_ONCE,
+                                master_seed=master_seed, target_steps=target_steps,
+                                time_budget=time_budget, generator='pcg64', prune_dead=True)
+
+    # Print the improvements in the order they were found, the best one comes last
+    for solution in solutions:
+        print(f"Worker {solution.worker} (seed {solution.seed}):", len(solution.edges), "steps:",
+              compiled_graph.edge_directions(solution.edges))
@@ -0,0 +1,68 @@
+from chilly import EDGES_ONCE, find_eggs, find_exit, find_player
+from chilly.cache import load_graph
+from chilly.replica import ReplicaExchange, tempering_biases
+from chilly.streams import BlockRandom
+
+# Define the grid
+data = [
+    "OY T    $ Y$Y",
+    " X          Y",
+    "  T # T   $O ",
+    " T       T  T",
+    "#Y   #  TT# T",
+    "Y T $    Y ##",
+    "      Y T $  ",
+    "TT   Y  Y#Y T",
+    " $ #    # $T ",
+    "  $ # Y   T  ",
+    "T    T     P#",
+    "  Y $  Y T  Y"
+]
+
+# Mapping for wormhole destinations
+wormhole_mapping = {
+    '(0, 0)': '(2, 11)',
+    '(2, 11)': '(0, 0)'
+}
+
+##################
+# Create the graph
+##################
+# Built on the first run, then loaded from the graph cache (see chilly/cache.py)
+compiled_graph = load_graph(data, wormhole_mapping)
+print(compiled_graph)
+
+start_node = find_player(data)
+end_node = find_exit(data)
+print(f"Start {start_node} to exit {end_node}")
+
+# Find the egg positions
+egg_nodes = find_eggs(data)
+print(f"Eggs: {egg_nodes}")
+
+print("###########################################")
+print("Replica Exchange Monte Carlo (Tempering)")
+print("###########################################")
+
+# One replica per inverse temperature of the path length energy E(L) = -L,
+# invkT = 0 is the brute force walk, the largest invkT pushes to the longest paths
+invkTs = [0.0, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.35]
+swap_interval = 1000  # Number of moves of every replica between the swap attempts
+cycles_per_check = 100  # Number of swap cycles between the progress reports
+minimum_steps = 77  # Number of minimal steps to take
+seed = None  # Seed of the random stream, None draws a fresh one (printed, set it here to repeat the run)
+rng = BlockRandom(seed)
+print("Seed:", rng.seed)
+
+exchange = ReplicaExchange(compiled_graph, tempering_biases(compiled_graph.num_edges, invkTs),
+                           minimum_steps=minimum_steps, rule=EDGES_ONCE, rng=rng)
+
+while exchange.best is None:
+    exchange.run(cycles_per_check, swap_interval)
+    print(f"cycle {exchange.cycles}: lengths {[replica.length for replica in exchange.replicas]}, "
+          f"swap acceptance {[round(rate, 2) for rate in exchange.acceptance_rates()]}")
+
+result_edges = exchange.best
+result_path = compiled_graph.nodes_of(result_edges)
+print("Path taken:", compiled_graph.labels_of(result_path), " with length: ", len(result_edges))
+print(len(result_edges), "steps:", compiled_graph.edge_directions(result_edges))
@@ -0,0 +1,65 @@
+from chilly import EDGES_ONCE, find_eggs, find_exit, find_player
+from chilly.cache import load_graph
+from chilly.brute_force import brute_force_walk
+from chilly.solutions import SolutionLog, stream_solutions
+from chilly.streams import BlockRandom
+
+# Define the grid
+data = [
+    "OY T    $ Y$Y",
+    " X          Y",
+    "  T # T   $O ",
+    " T       T  T",
+    "#Y   #  TT# T",
+    "Y T $    Y ##",
+    "      Y T $  ",
+    "TT   Y  Y#Y T",
+    " $ #    # $T ",
+    "  $ # Y   T  ",
+    "T    T     P#",
+    "  Y $  Y T  Y"
+]
+
+# Mapping for wormhole destinations
+wormhole_mapping = {
+    '(0, 0)': '(2, 11)',
+    '(2, 11)': '(0, 0)'
+}
+
+##################
+# Create the graph
+##################
+# Built on the first run, then loaded from the graph cache (see chilly/cache.py)
+compiled_graph = load_graph(data, wormhole_mapping)
+print(compiled_graph)
+
+start_node = find_player(data)
+end_node = find_exit(data)
+print(f"Start {start_node} to exit {end_node}")
+
+# Find the egg positions
+egg_nodes = find_eggs(data)
+print(f"Eggs: {egg_nodes}")
+
+print("###########################################")
+print("Streaming Brute Force Monte Carlo")
+print("###########################################")
+
+minimum_steps = 60  # Number of minimal steps to take
+seed = 2025  # Seed of the walker, stored with every solution
+max_moves = 500000000  # The walk goes on after every hit, stop it after that many moves
+log_file = "Chilly_Solutions_Puzzle3.ndjson"  # One JSON line per distinct solution, reused by the next run
+
+with SolutionLog(log_file, top_k=10) as log:
+    print(f"{len(log)} solutions already in {log_file}")
+    walk = brute_force_walk(compiled_graph, minimum_steps, rule=EDGES_ONCE, rng=BlockRandom(seed),
+                            max_moves=max_moves, prune_dead=True, with_moves=True)
+
+    # Print every new solution as soon as it is found
+    for solution in stream_solutions(compiled_graph, walk, log, seed):
+        print(solution.length, "steps:", solution.directions, f"(move {solution.move} of the walk)")
+
+    print(f"{len(log)} distinct solutions, {log.duplicates} found again")
+    print("Longest solutions:")
+    for length, directions in log.top():
+        print(length, "steps:", directions)
@@ -0,0 +1,73 @@
+from chilly import EDGES_ONCE, find_eggs, find_exit, find_player
+from chilly.cache import load_graph
+from chilly.wang_landau import WangLandau, wang_landau_walk
+from chilly.streams import BlockRandom
+
+# Define the grid
+data = [
+    "OY T    $ Y$Y",
+    " X          Y",
+    "  T # T   $O ",
+    " T       T  T",
+    "#Y   #  TT# T",
+    "Y T $    Y ##",
+    "      Y T $  ",
+    "TT   Y  Y#Y T",
+    " $ #    # $T ",
+    "  $ # Y   T  ",
+    "T    T     P#",
+    "  Y $  Y T  Y"
+]
+
+# Mapping for wormhole destinations
+wormhole_mapping = {
+    '(0, 0)': '(2, 11)',
+    '(2, 11)': '(0, 0)'
+}
+
+##################
+# Create the graph
+##################
+# Built on the first run, then loaded from the graph cache (see chilly/cache.py)
+compiled_graph = load_graph(data, wormhole_mapping)
+print(compiled_graph)
+
+start_node = find_player(data)
+end_node = find_exit(data)
+print(f"Start {start_node} to exit {end_node}")
+
+# Find the egg positions
+egg_nodes = find_eggs(data)
+print(f"Eggs: {egg_nodes}")
+
+print("###########################################")
+print("Wang-Landau Monte Carlo")
+print("###########################################")
+
+minimum_steps = 77  # Number of minimal steps to take
+seed = None  # Seed of the random stream, None draws a fresh one (printed, set it here to repeat the run)
+rng = BlockRandom(seed)
+print("Seed:", rng.seed)
+
+# Density of states ln g(L) over the path length, updated after every move
+sampler = WangLandau(compiled_graph, rule=EDGES_ONCE, ln_f=1.0, ln_f_final=1e-6, flatness=0.8, rng=rng)
+result_path, all_traversed_nodes, result_edges = next(wang_landau_walk(compiled_graph, minimum_steps, sampler=sampler))
+
+# Translate the node ids back to the ('row', columns') strings
+result_path_labels = compiled_graph.labels_of(result_path)
+
+# Print the result
+print("Path taken:", result_path_labels, " with length: ", len(result_path)-1)
+print(len(result_edges), "steps:", compiled_graph.edge_directions(result_edges))
+
+# Estimated ln g(L) so far, exp(ln g(L)) is the number of walks with L steps from the start
+ln_g = sampler.ln_g_estimate()
+print("Stage", sampler.stage, "with ln_f", sampler.ln_f)
+for L, value in enumerate(ln_g):
+    print(L, value)
+
+# Save to text file
+with open("Chilly_Results_Puzzle3_WangLandau.txt", "w") as file:
+    file.write("# LengthPath ln_g(L)\n")
+    for L, value in enumerate(ln_g):
+        file.write(f"{L:<8d} {value:<8f}\n")
@@ -0,0 +1,31 @@
+# Chilly's Monte Carlo Adventure: shared building blocks for the puzzle scripts
+from .graph import (
+    EDGES_K_TIMES,
+    EDGES_ONCE,
+    NODES_ONCE,
+    CompiledGraph,
+    BoardCells,
+    EdgePayload,
+    GraphTables,
+    compile_graph,
+    create_graph,
+    find_eggs,
+    find_exit,
+    find_player,
+    find_wormholes,
+    replace_wormhole_destinations,
+    scan_board,
+)
+from .board import Board, compile_board, format_board, load_board, load_boards, parse_board, save_board
+from .bulk import BulkMoves
+from .core import Bias, Walker
+from .samplers import (
+    SAMPLERS,
+    BruteForceSampler,
+    ExitGuidedSampler,
+    IBISampler,
+    PERMSampler,
+    Sampler,
+    UmbrellaSampler,
+    WangLandauSampler,
+)
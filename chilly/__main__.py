@@ -0,0 +1,131 @@
+import argparse
+import ast
+import json
+import sys
+import time
+
+from .board import RULE_NAMES, RULES, board_paths, compile_board, load_board
+from .cache import DEFAULT_CACHE_DIR
+from .samplers import SAMPLERS
+
+
+# Function to parse a sampler option KEY=VALUE, the value as Python literal if it is one (e.g. L0=40)
+def parse_option(option):
+    key, separator, value = option.partition('=')
+    if not separator or not key:
+        raise argparse.ArgumentTypeError(f"{option!r} is not of the form KEY=VALUE")
+    try:
+        value = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        pass  # Plain string
+    return key, value
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m chilly',
+                                     description="Search the longest path of Chilly on a board file")
+    parser.add_argument('board', help="board file or directory of board files, see boards/")
+    parser.add_argument('--rule', choices=RULES,
+                        help="visit every edge or every node once, or every edge at most k times "
+                             "(default: the rule of the board file, else edge-once)")
+    parser.add_argument('--sampler', choices=SAMPLERS, default='brute_force')
+    parser.add_argument('--time-budget', type=float, help="seconds of sampling")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes, 1 samples in this process")
+    parser.add_argument('--minimum-steps', type=int, default=0, help="shortest solution to report")
+    parser.add_argument('--target-steps', type=int,
+                        help="stop at a solution of that length (default: the target of the board file)")
+    parser.add_argument('--max-moves', type=int, help="attempted moves of every worker")
+    parser.add_argument('--seed', type=int, default=0, help="master seed of the random streams")
+    parser.add_argument('--option', type=parse_option, action='append', default=[], metavar='KEY=VALUE',
+                        help="option of the sampler, e.g. L0=40 (repeatable)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="directory of the graph cache")
+    parser.add_argument('--no-cache', action='store_true', help="build the graph without the graph cache")
+    parser.add_argument('--json', action='store_true', help="print the result as one JSON object per board (one per line)")
+    arguments = parser.parse_args(argv)
+    if arguments.rule is not None and RULES[arguments.rule] not in SAMPLERS[arguments.sampler].rules:
+        parser.error(f"--sampler {arguments.sampler} does not support --rule {arguments.rule}, use one of "
+                     f"{', '.join(RULE_NAMES[rule] for rule in SAMPLERS[arguments.sampler].rules)}")
+    try:
+        SAMPLERS[arguments.sampler].check_options(dict(arguments.option))
+    except ValueError as error:
+        parser.error(str(error))
+    return arguments
+
+
+# A board that cannot be read, compiled or searched is reported and skipped, the others of a
+# directory are still searched and the exit status tells that one failed
+def main(argv=None):
+    arguments = parse_arguments(argv)
+    paths = board_paths(arguments.board)
+    if not paths:
+        sys.exit(f"python -m chilly: error: no board files in {arguments.board}")
+    failures = 0
+    for path in paths:
+        # Startup: read the board and load (or build) the compiled graph, timed apart from the sampling
+        begin = time.perf_counter()
+        try:
+            graph, sampler, target_steps = prepare_board(arguments, path)
+        except (OSError, ValueError) as error:
+            print(f"python -m chilly: error: {error}", file=sys.stderr)
+            failures += 1
+            continue
+        search_board(arguments, path, graph, sampler, target_steps, time.perf_counter() - begin)
+    if failures:
+        sys.exit(1)
+
+
+# Function to read and compile a board and set up its sampler with the options of the command line,
+# the rule and the target of the board file fill in for the ones not given. Returns (graph, sampler,
+# target_steps), raises ValueError if the board is broken, the sampler does not support the rule
+# or nothing ends the search
+def prepare_board(arguments, path):
+    board = load_board(path)
+    rule = RULES[arguments.rule] if arguments.rule is not None else board.rule or RULES['edge-once']
+    target_steps = arguments.target_steps if arguments.target_steps is not None else board.target_steps
+    if rule not in SAMPLERS[arguments.sampler].rules:
+        raise ValueError(f"{path}: --sampler {arguments.sampler} does not support the rule "
+                         f"{RULE_NAMES[rule]} of the board file, give another one with --rule")
+    if arguments.time_budget is None and arguments.max_moves is None and target_steps is None:
+        raise ValueError(f"{path}: one of --time-budget, --max-moves or --target-steps "
+                         f"(or a target in the board file) is required")
+    try:
+        graph = compile_board(board, None if arguments.no_cache else arguments.cache_dir)
+        sampler = SAMPLERS[arguments.sampler](graph, rule, **dict(arguments.option))
+    except ValueError as error:
+        raise ValueError(f"{path}: {error}") from error
+    return graph, sampler, target_steps
+
+
+# Function to search one board with its sampler and print the result, startup_seconds: time
+# to read the board and get the compiled graph
+def search_board(arguments, path, graph, sampler, target_steps, startup_seconds):
+    begin = time.perf_counter()
+    solutions = sampler.search(arguments.minimum_steps, arguments.time_budget, arguments.max_moves,
+                               target_steps, arguments.workers, arguments.seed)
+    sampling_seconds = time.perf_counter() - begin
+
+    # One JSON object (line) per board
+    if arguments.json:
+        json.dump({'board': path, 'rule': RULE_NAMES[sampler.rule], 'sampler': arguments.sampler,
+                   'options': dict(arguments.option), 'workers': arguments.workers, 'seed': arguments.seed,
+                   'nodes': graph.num_nodes, 'edges': graph.num_edges,
+                   'startup_seconds': round(startup_seconds, 6), 'sampling_seconds': round(sampling_seconds, 6),
+                   'solutions': [{'length': len(solution.edges), 'directions': graph.edge_directions(solution.edges),
+                                  'worker': solution.worker, 'index': solution.index} for solution in solutions]},
+                  sys.stdout)
+        print()
+        return
+
+    print(f"Board: {path}")
+    print(graph)
+    print(f"Startup: {startup_seconds:.3f} s")
+    print(f"{sampler} on {arguments.workers} worker(s), seed {arguments.seed}")
+    for solution in solutions:
+        print(f"Worker {solution.worker}: {len(solution.edges)} steps: {graph.edge_directions(solution.edges)}")
+    if not solutions:
+        print("No solution found")
+    print(f"Sampling: {sampling_seconds:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .graph import EDGES_ONCE
+
+# A solution found by one walker of the batch: index of the walker, step of the
+# batch at which the exit was hit and the edge ids of the path
+BatchSolution = namedtuple('BatchSolution', ['walker', 'step', 'edges'])
+
+
+class BatchWalker:
+    """Many independent Monte Carlo walkers on one compiled graph, advanced in lockstep.
+
+    Every walker performs the same dynamics as monte_carlo_walk in the scripts:
+    with probability 1 - 1/(valid moves + 1) it tries a random valid move,
+    otherwise it reverses the last move. The state of all walkers is kept in
+    NumPy arrays (current node, stack of edge ids, visited slots, egg counts)
+    and one call of step() advances all of them by one move with array
+    operations only.
+
+    An optional bias table U[L] over the path length L turns the move into a
+    Metropolis step: a move from L to L+1 is accepted with probability
+    min(1, exp(-invkT * (U[L+1] - U[L]))), a rejected walker stays where it is.
+    """
+
+    def __init__(self, graph, num_walkers, rule=EDGES_ONCE, minimum_steps=0,
+                 bias=None, invkT=1.0, rng=None):
+        self.graph = graph
+        self.num_walkers = num_walkers
+        self.rule = rule
+        self.minimum_steps = minimum_steps
+        self.invkT = invkT
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        num_edges = graph.num_edges
+        sentinel = num_edges  # edge id of the padding, its slot is always blocked
+
+        # Out edges of every node, padded with the sentinel edge
+        degrees = [graph.offsets[n + 1] - graph.offsets[n] for n in range(graph.num_nodes)]
+        max_degree = max(degrees, default=0)
+        self.out_table = np.full((graph.num_nodes, max(max_degree, 1)), sentinel, dtype=np.int32)
+        for n in range(graph.num_nodes):
+            self.out_table[n, :degrees[n]] = graph.out_edges(n)
+
+        # Slot visited by taking an edge (itself or its destination, see CompiledGraph.blocked_by),
+        # the sentinel edge gets the last slot
+        blocked_by = np.asarray(graph.blocked_by(rule), dtype=np.int32)
+        self.num_slots = len(graph.new_visited(rule))
+        self.slots = np.append(blocked_by, np.int32(self.num_slots))
+
+        self.targets = np.asarray(graph.targets, dtype=np.int32)
+        self.sources = np.asarray(graph.sources, dtype=np.int32)
+
+        # Eggs collected by every edge
+        self.egg_table = np.zeros((num_edges, len(graph.eggs)), dtype=np.int16)
+        for e, payload in enumerate(graph.payloads):
+            for egg in payload.eggs:
+                self.egg_table[e, egg] += 1
+
+        # Bias over the path length, the last entry is reused for longer paths
+        if bias is None:
+            self.bias = None
+        else:
+            self.bias = np.zeros(num_edges + 2)
+            values = np.asarray(bias, dtype=float)[:num_edges + 2]
+            self.bias[:len(values)] = values
+            self.bias[len(values):] = values[-1]
+
+        self.reset()
+
+    # Put all walkers back on the start node
+    def reset(self):
+        num_walkers, num_edges, num_slots = self.num_walkers, self.graph.num_edges, self.num_slots
+        self.current = np.full(num_walkers, self.graph.start, dtype=np.int32)
+        self.depth = np.zeros(num_walkers, dtype=np.int32)
+        self.stack = np.zeros((num_walkers, max(num_edges, 1)), dtype=np.int32)
+        self.blocked = np.zeros((num_walkers, num_slots + 1), dtype=bool)
+        self.blocked[:, num_slots] = True
+        self.egg_counts = np.zeros((num_walkers, len(self.graph.eggs)), dtype=np.int16)
+        self.steps = 0
+        self.accepted = 0
+        self.backtracks = 0
+
+    # Advance every walker by one move and return the solutions found in this step
+    def step(self):
+        rng = self.rng
+        rows = np.arange(self.num_walkers)
+
+        # Valid moves of every walker
+        candidates = self.out_table[self.current]
+        valid = ~self.blocked[rows[:, None], self.slots[candidates]]
+        num_valid = valid.sum(axis=1)
+
+        # Decide whether to move or reverse the last move, and which move to take
+        grow = rng.random(self.num_walkers) > 1.0 / (num_valid + 1)
+        choice = (rng.random(self.num_walkers) * num_valid).astype(np.int32)
+        column = np.argmax(np.cumsum(valid, axis=1) > choice[:, None], axis=1)
+        edges = candidates[rows, column]
+
+        # Metropolis acceptance on the path length bias
+        if self.bias is not None:
+            dE = self.bias[self.depth + 1] - self.bias[self.depth]
+            accept = rng.random(self.num_walkers) < np.exp(-self.invkT * dE)
+            reverse = ~grow & (self.depth > 0)
+            grow &= accept
+        else:
+            reverse = ~grow & (self.depth > 0)
+
+        solutions = []
+        self.steps += 1
+
+        # Forward moves
+        movers = np.nonzero(grow)[0]
+        if len(movers):
+            moved = edges[movers]
+            self.stack[movers, self.depth[movers]] = moved
+            self.depth[movers] += 1
+            self.blocked[movers, self.slots[moved]] = True
+            self.egg_counts[movers] += self.egg_table[moved]
+            self.current[movers] = self.targets[moved]
+            self.accepted += len(movers)
+
+            # Check for end-condition
+            hits = movers[(self.current[movers] == self.graph.exit)
+                          & (self.depth[movers] >= self.minimum_steps)]
+            if len(hits):
+                hits = hits[(self.egg_counts[hits] > 0).all(axis=1)]
+                for walker in hits:
+                    solutions.append(BatchSolution(int(walker), self.steps,
+                                                   self.stack[walker, :self.depth[walker]].tolist()))
+
+        # Reverse moves
+        reversers = np.nonzero(reverse)[0]
+        if len(reversers):
+            self.depth[reversers] -= 1
+            popped = self.stack[reversers, self.depth[reversers]]
+            self.blocked[reversers, self.slots[popped]] = False
+            self.egg_counts[reversers] -= self.egg_table[popped]
+            self.current[reversers] = self.sources[popped]
+            self.backtracks += len(reversers)
+
+        return solutions
+
+    # Run a number of steps, stop early at the first solution if asked so
+    def run(self, steps, stop_at_first=True):
+        solutions = []
+        for _ in range(steps):
+            found = self.step()
+            if found:
+                solutions.extend(found)
+                if stop_at_first:
+                    break
+        return solutions
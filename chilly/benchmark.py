@@ -0,0 +1,94 @@
+import random
+import time
+import tracemalloc
+from collections import namedtuple
+
+from .graph import EDGES_ONCE, compile_graph, create_graph, find_eggs, find_exit, find_player
+from .graph import replace_wormhole_destinations
+from .parallel import get_walker
+from .playfield import random_playfield
+from .reachability import ReachabilityOracle
+
+# One line of the benchmark: board size and walker, size of the compiled graph, seconds to
+# build it (create_graph, wormholes, compile_graph), moves per second, seconds to the first
+# solution (None if none within the move budget) and peak traced memory of building and walking
+BenchmarkResult = namedtuple('BenchmarkResult', ['size', 'walker', 'nodes', 'edges', 'build_seconds',
+                                                 'moves_per_second', 'first_solution_seconds',
+                                                 'build_memory_mb', 'walk_memory_mb'])
+
+# Walkers to compare: label -> (sampler name of get_walker, options)
+DEFAULT_WALKERS = {
+    'brute_force': ('brute_force', {}),
+    'brute_force_pruned': ('brute_force', {'prune_dead': True}),
+    'exit_guided': ('exit_guided', {'prune_dead': True}),
+    'wang_landau': ('wang_landau', {'verbose': False}),
+    'umbrella': ('umbrella', {'verbose': False}),
+    'ibi': ('ibi', {'verbose': False}),
+}
+
+
+# Function to build the compiled graph of a playfield, returns the graph and the seconds taken
+def build_graph(data, wormhole_mapping):
+    begin = time.perf_counter()
+    graph = replace_wormhole_destinations(create_graph(data), wormhole_mapping)
+    compiled_graph = compile_graph(graph, find_player(data), find_exit(data), find_eggs(data))
+    return compiled_graph, time.perf_counter() - begin
+
+
+# Function to benchmark the walkers on one playfield
+#
+# moves: number of moves timed for the move rate (no solution is ever accepted there)
+# solution_moves: move budget for the first solution (minimum_steps 0)
+# memory_moves: number of moves walked under tracemalloc for the peak memory
+def benchmark_board(data, wormhole_mapping, walkers=DEFAULT_WALKERS, rule=EDGES_ONCE, moves=100000,
+                    solution_moves=1000000, memory_moves=10000, seed=0):
+    size = f"{len(data)}x{len(data[0])}"
+
+    # Build once for the timing and once under tracemalloc, which slows everything down
+    compiled_graph, build_seconds = build_graph(data, wormhole_mapping)
+    tracemalloc.start()
+    build_graph(data, wormhole_mapping)
+    build_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    unreachable = compiled_graph.num_edges + 1  # No path reaches that many steps
+    for label, (sampler, options) in walkers.items():
+        walk = get_walker(sampler)
+
+        begin = time.perf_counter()
+        for _ in walk(compiled_graph, unreachable, rule=rule, rng=random.Random(seed), max_moves=moves, **options):
+            pass
+        moves_per_second = moves / (time.perf_counter() - begin)
+
+        first_solution = None
+        begin = time.perf_counter()
+        for _ in walk(compiled_graph, 0, rule=rule, rng=random.Random(seed), max_moves=solution_moves, **options):
+            first_solution = time.perf_counter() - begin
+            break
+
+        tracemalloc.start()
+        for _ in walk(compiled_graph, unreachable, rule=rule, rng=random.Random(seed), max_moves=memory_moves,
+                      **options):
+            pass
+        walk_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        yield BenchmarkResult(size, label, compiled_graph.num_nodes, compiled_graph.num_edges, build_seconds,
+                              moves_per_second, first_solution, build_memory / 1e6, walk_memory / 1e6)
+
+
+# Function to benchmark the walkers on random square playfields of growing size
+# (see random_playfield), yields one BenchmarkResult per size and walker. Playfields
+# whose exit or eggs cannot be reached from the start are drawn again.
+def scaling_benchmark(sizes=(8, 16, 32, 64, 128, 200), walkers=DEFAULT_WALKERS, rule=EDGES_ONCE,
+                      obstacle_density=0.2, eggs=4, wormholes=2, seed=0, attempts=100, **budgets):
+    rng = random.Random(seed)
+    for size in sizes:
+        for _ in range(attempts):
+            data, wormhole_mapping = random_playfield(size, size, obstacle_density, eggs, wormholes, rng)
+            compiled_graph, _ = build_graph(data, wormhole_mapping)
+            if ReachabilityOracle(compiled_graph).alive(compiled_graph.start, (1 << eggs) - 1):
+                break
+        else:
+            raise ValueError(f"No {size}x{size} playfield with reachable exit and eggs in {attempts} attempts")
+        yield from benchmark_board(data, wormhole_mapping, walkers, rule, seed=seed, **budgets)
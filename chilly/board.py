@@ -0,0 +1,208 @@
+import json
+import os
+from collections import namedtuple
+
+from .cache import DEFAULT_CACHE_DIR, load_graph
+from .graph import (EDGES_K_TIMES, EDGES_ONCE, NODES_ONCE, BoardCells, compile_graph, create_graph,
+                    replace_wormhole_destinations, scan_board, scan_row)
+
+# Rules by their name in the board files and on the command line, edge-k-times takes k as option max_uses
+RULES = {'edge-once': EDGES_ONCE, 'node-once': NODES_ONCE, 'edge-k-times': EDGES_K_TIMES}
+RULE_NAMES = {rule: name for name, rule in RULES.items()}
+
+# Extensions of the board files in a directory (see load_boards)
+BOARD_EXTENSIONS = ('.txt', '.json')
+
+# A playfield: the grid rows and the wormhole mapping as in the puzzle scripts, the rule and
+# the target length of its board file (None if not given) and the BoardCells of the grid
+# (see scan_board, None to scan the grid when needed)
+Board = namedtuple('Board', ['data', 'wormhole_mapping', 'rule', 'target_steps', 'cells'],
+                   defaults=(None, None, None))
+
+
+# Function to parse a board in the text format of the board files (see boards/)
+#
+# A header of 'key: value' lines, then the grid with one row per line between
+# two '|' (which keep the spaces at the ends of a row), e.g.
+#
+#   # Puzzle 1 (comment lines start with '#', blank lines are skipped)
+#   rule: edge-once
+#   target: 50
+#   wormholes: (4, 1) -> (1, 4) -> (6, 6)
+#   |###YY#T#|
+#   |X $YO$ P|
+#   ...
+#
+# rule: edge-once, node-once or edge-k-times (optional)
+# target: length of the path to stop the search at (optional)
+# wormholes: a cycle of wormholes, every one leads to the next one and the last one
+#            to the first, one line per cycle (a pair is a cycle of two)
+#
+# The text is read in a single pass, the rows are scanned for the player, exit,
+# eggs, wormholes and valid fields as they come (see scan_row). name (e.g. the
+# file name) goes into the error messages.
+def parse_board(text, name='<board>'):
+    rule = target_steps = None
+    wormhole_mapping = {}
+    data = []
+    row_lines = []  # Line number of every row of the grid
+    cells = {'start': None, 'exit': None, 'eggs': [], 'wormholes': [], 'valid_fields': []}
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if line.startswith('|'):
+            if len(line) < 2 or not line.endswith('|'):
+                raise ValueError(f"{name}:{number}: a row of the grid must start and end with '|'")
+            row = line[1:-1]
+            row_lines.append(number)
+            scan_row(len(data), row, cells)
+            data.append(row)
+            continue
+        if not line or line.startswith('#'):
+            continue
+
+        # Header line
+        if data:
+            raise ValueError(f"{name}:{number}: header line after the grid")
+        key, separator, value = line.partition(':')
+        key, value = key.strip(), value.strip()
+        if not separator:
+            raise ValueError(f"{name}:{number}: expected 'key: value' or a row of the grid between '|'")
+        if key == 'rule':
+            if value not in RULES:
+                raise ValueError(f"{name}:{number}: unknown rule {value!r}, expected one of {', '.join(RULES)}")
+            rule = RULES[value]
+        elif key == 'target':
+            if not value.isdigit():
+                raise ValueError(f"{name}:{number}: the target must be a number of steps, not {value!r}")
+            target_steps = int(value)
+        elif key == 'wormholes':
+            cycle = [_parse_cell(cell, name, number) for cell in value.split('->')]
+            if len(cycle) < 2:
+                raise ValueError(f"{name}:{number}: a wormhole cycle needs at least two wormholes")
+            for hole, destination in zip(cycle, cycle[1:] + cycle[:1]):
+                if hole in wormhole_mapping:
+                    raise ValueError(f"{name}:{number}: wormhole {hole} is in two cycles")
+                wormhole_mapping[hole] = destination
+        else:
+            raise ValueError(f"{name}:{number}: unknown header key {key!r}, expected rule, target or wormholes")
+
+    cells = BoardCells(**cells)
+    _check_board(data, wormhole_mapping, cells, name, row_lines)
+    return Board(data, wormhole_mapping, rule, target_steps, cells)
+
+
+# Function to parse a cell '(row, col)' of the header into its label
+def _parse_cell(text, name, number):
+    text = text.strip()
+    r, separator, c = text[1:-1].partition(',')
+    if not (text.startswith('(') and text.endswith(')') and separator and
+            r.strip().isdigit() and c.strip().isdigit()):
+        raise ValueError(f"{name}:{number}: {text!r} is not a cell '(row, col)'")
+    return str((int(r), int(c)))
+
+
+# Function to check the grid and the wormhole mapping of a board, the errors give the line
+# of the grid (or of the row) in the board file if row_lines holds the line of every row
+def _check_board(data, wormhole_mapping, cells, name, row_lines=None):
+    def where(r):
+        return f"{name}:{row_lines[r]}" if row_lines else name
+
+    if not data or any(len(row) != len(data[0]) for row in data):
+        raise ValueError(f"{where(0)}: the rows of the board must be non-empty and of equal length")
+    if cells.start is None:
+        raise ValueError(f"{where(0)}: the board has no player 'P'")
+    if cells.exit is None:
+        raise ValueError(f"{where(0)}: the board has no exit 'X'")
+
+    # Every row and column needs a cell that ends the slides along it (' ', '$' and 'P' are slid over)
+    for r, row in enumerate(data):
+        if all(cell in ' $P' for cell in row):
+            raise ValueError(f"{where(r)}: row {r} has no obstacle, exit or wormhole, a slide along it never stops")
+    for c in range(len(data[0])):
+        if all(row[c] in ' $P' for row in data):
+            raise ValueError(f"{where(0)}: column {c} has no obstacle, exit or wormhole, "
+                             f"a slide along it never stops")
+
+    wormholes = set(cells.wormholes)
+    for hole in wormhole_mapping:
+        if hole not in wormholes or wormhole_mapping[hole] not in wormholes:
+            raise ValueError(f"{where(0)}: {hole} -> {wormhole_mapping[hole]} links a cell that is no wormhole 'O'")
+
+
+# Function to read a board file: the text format of parse_board, or with the extension
+# .json a JSON object with the grid rows as "data", the optional wormhole mapping as
+# "wormhole_mapping" ('(row, col)' strings) and the optional "rule" and "target"
+def load_board(path):
+    with open(path) as file:
+        if not path.endswith('.json'):
+            return parse_board(file.read(), path)
+        try:
+            board = json.load(file)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"{path}:{error.lineno}: {error.msg}") from error
+    if not isinstance(board, dict) or 'data' not in board:
+        raise ValueError(f"{path}: expected a JSON object with the grid rows as \"data\"")
+    data = board['data']
+    wormhole_mapping = board.get('wormhole_mapping', {})
+    rule = board.get('rule')
+    if rule is not None and rule not in RULES:
+        raise ValueError(f"{path}: unknown rule {rule!r}, expected one of {', '.join(RULES)}")
+    cells = scan_board(data)
+    _check_board(data, wormhole_mapping, cells, path)
+    return Board(data, wormhole_mapping, RULES.get(rule), board.get('target'), cells)
+
+
+# Function to list the board files of a path: the file itself, or the board files of a
+# directory (see BOARD_EXTENSIONS) sorted by name
+def board_paths(path):
+    if not os.path.isdir(path):
+        return [path]
+    return sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(BOARD_EXTENSIONS))
+
+
+# Function to read the boards of a file or a directory one at a time, yields (path, Board)
+def load_boards(path):
+    for board_path in board_paths(path):
+        yield board_path, load_board(board_path)
+
+
+# Function to write a board in the text format of parse_board, the wormhole mapping
+# has to be made of cycles (like the ones of random_playfield)
+def format_board(board, comment=None):
+    lines = [f"# {comment}"] if comment else []
+    if board.rule is not None:
+        lines.append(f"rule: {RULE_NAMES[board.rule]}")
+    if board.target_steps is not None:
+        lines.append(f"target: {board.target_steps}")
+
+    # Follow every wormhole around its cycle
+    remaining = dict(board.wormhole_mapping)
+    while remaining:
+        hole = next(iter(remaining))
+        destination = remaining.pop(hole)
+        cycle = [hole]
+        while destination != hole:
+            if destination not in remaining:
+                raise ValueError(f"The wormhole mapping is no set of cycles, {cycle[-1]} -> {destination}")
+            cycle.append(destination)
+            destination = remaining.pop(destination)
+        lines.append(f"wormholes: {' -> '.join(cycle)}")
+
+    lines.extend(f"|{row}|" for row in board.data)
+    return '\n'.join(lines) + '\n'
+
+
+# Function to save a board to a file in the text format
+def save_board(board, path, comment=None):
+    with open(path, 'w') as file:
+        file.write(format_board(board, comment))
+
+
+# Function to get the compiled graph of a board, from the graph cache (see chilly/cache.py)
+# or, with cache_dir None, built without touching the disk
+def compile_board(board, cache_dir=DEFAULT_CACHE_DIR):
+    cells = board.cells if board.cells is not None else scan_board(board.data)
+    if cache_dir is not None:
+        return load_graph(board.data, board.wormhole_mapping, cache_dir, cells)
+    graph = replace_wormhole_destinations(create_graph(board.data), board.wormhole_mapping)
+    return compile_graph(graph, cells.start, cells.exit, cells.eggs)
@@ -0,0 +1,57 @@
+import random
+
+from .core import Walker
+from .graph import EDGES_ONCE
+
+# Brute Force Monte Carlo walk on the compiled graph
+#
+# Random motion on the graph under the edge once or node once rule with
+# backtracking: with probability 1 - 1/(valid moves + 1) a random valid move is
+# taken, otherwise the last move is reversed. Every arrival at the exit with all
+# eggs collected and at least minimum_steps steps is yielded as
+# (path, all_traversed_nodes_path, edge_path) and the walk simply goes on, so
+# next() gives the first solution like the scripts used to do. The moves are made
+# by the unbiased Walker (see chilly/core.py), a block of check_interval moves at
+# a time, the solutions of a block are yielded at its end.
+#
+# rule: EDGES_ONCE, NODES_ONCE or EDGES_K_TIMES (every edge at most max_uses times)
+# rng: source of the random numbers (random.random and random.choice interface)
+# best: shared value (e.g. multiprocessing.Value), only solutions longer than best.value are yielded
+# stop: shared event (e.g. multiprocessing.Event), the walk ends once it is set
+# max_moves: the walk ends after that many attempted moves
+# check_interval: number of moves between two checks of stop
+# prune_dead: reject every move into a prefix from which the exit or a missing egg
+#             can no longer be reached (see ReachabilityOracle)
+# telemetry: Telemetry (see chilly/telemetry.py) that gets the counters of every
+#            check_interval moves: attempted and accepted (forward) moves, backtracks,
+#            dead ends (no valid move left), pruned moves, exit visits and the longest path
+# bulk_moves: BulkMoves (or a tuple of regrow, reroute, interval) to add a tail regrowth
+#             or a segment reroute after every interval moves (see chilly/bulk.py), the
+#             telemetry then gets bulk_attempted and bulk_accepted too
+# jit: make the moves with the Numba compiled move loop if Numba is installed, same walk
+#      (edge once or node once without prune_dead and with a BlockRandom rng, see chilly/jit.py)
+# with_moves: yield (path, all_traversed_nodes_path, edge_path, move), move the number of
+#             moves of the walk when the solution was hit (see stream_solutions)
+def brute_force_walk(graph, minimum_steps, rule=EDGES_ONCE, rng=random, best=None, stop=None,
+                     max_moves=None, check_interval=100000, prune_dead=False, telemetry=None, max_uses=2,
+                     bulk_moves=None, jit=False, with_moves=False):
+    walker = Walker(graph, rule, rng=rng, prune_dead=prune_dead, max_uses=max_uses, bulk_moves=bulk_moves, jit=jit)
+
+    moves = 0
+    while max_moves is None or moves < max_moves:
+        if stop is not None and stop.is_set():
+            return
+        sweeps = check_interval if max_moves is None else min(check_interval, max_moves - moves)
+        moves += sweeps
+
+        solutions = walker.run(sweeps, minimum_steps, best)
+        if telemetry is not None:
+            telemetry.block('brute_force', moves, walker.length, walker.max_depth, **walker.block_counts)
+
+        for (path, all_traversed_nodes_path, edge_path), move in zip(solutions, walker.hits):
+            # The shared best one may have grown since the solution was hit
+            if best is None or len(edge_path) > best.value:
+                if with_moves:
+                    yield path, all_traversed_nodes_path, edge_path, move
+                else:
+                    yield path, all_traversed_nodes_path, edge_path
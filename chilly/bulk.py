@@ -0,0 +1,149 @@
+import math
+from collections import namedtuple
+
+# Bulk moves of the Walker (see chilly/core.py)
+#
+# The single moves only grow or reverse the path by one edge, so changing an
+# early decision of a long path means unwinding almost all of it. A bulk move
+# changes many edges at once, one is made after every interval single moves:
+#
+# regrow: the last regrow edges are removed and regrown in one shot, edge by edge
+#         uniform among the valid ones (Rosenbluth), accepted with the ratio of
+#         the Rosenbluth weights W = product of the numbers of valid choices
+# reroute: a segment of 1 .. reroute edges between two nodes of the path is cut
+#          out and replaced by a segment drawn uniformly among all segments of
+#          1 .. reroute edges between the same nodes that keep the rule with the
+#          rest of the path (the old one included)
+#
+# Both are Metropolis-Hastings moves in the distribution the single moves sample
+# (see log_weight), so they can be mixed in without changing it: exactly for the
+# brute force and Wang-Landau walks, roughly for the umbrella and IBI walks (see
+# UmbrellaBias). With both set every bulk move is one of them with equal
+# probability, 0 switches a move off.
+BulkMoves = namedtuple('BulkMoves', ['regrow', 'reroute', 'interval'], defaults=(8, 4, 100))
+
+
+# Function to get the log weight of the current state of a walker in the distribution
+# its single moves sample: the bias at the path length and, for the walkers whose
+# backtracking proposal is not corrected (all but Wang-Landau), log(n + 1) for the
+# n valid moves at the end of the path
+def log_weight(walker):
+    weight = walker.bias.log_weight(walker.length)
+    if walker.bias.choice_weighted:
+        weight += math.log(len(walker.valid_edges(walker.path[-1])) + 1)
+    return weight
+
+
+# Function to accept a move with the Metropolis probability min(1, exp(log_accept))
+def metropolis(rng, log_accept):
+    return log_accept >= 0 or rng.random() < math.exp(log_accept)
+
+
+# Function to regrow the last edges of the path, returns whether the move was accepted
+def regrow_tail(walker, length):
+    length = min(length, walker.length)
+    if length == 0:
+        return False
+    rng = walker.rng
+    old_weight = log_weight(walker)
+
+    # Rosenbluth weight of the old tail: the valid choices in front of each of its edges
+    old_tail = []
+    log_W_old = 0.0
+    for _ in range(length):
+        old_tail.append(walker.pop())
+        log_W_old += math.log(len(walker.valid_edges(walker.path[-1])))
+
+    # Grow the new tail, a dead end before its full length rejects the move
+    new_tail = []
+    log_W_new = 0.0
+    for _ in range(length):
+        choices = walker.valid_edges(walker.path[-1])
+        if not choices:
+            break
+        log_W_new += math.log(len(choices))
+        new_tail.append(choices[0] if len(choices) == 1 else rng.choice(choices))
+        walker.push(new_tail[-1])
+
+    if len(new_tail) == length and walker.alive() and \
+            metropolis(rng, log_W_new + log_weight(walker) - log_W_old - old_weight):
+        return True
+
+    # Rejected, back to the old tail
+    for _ in new_tail:
+        walker.pop()
+    for e in reversed(old_tail):
+        walker.push(e)
+    return False
+
+
+# Function to list all segments of 1 .. longest edges from node to target that the
+# walker can take in its current state
+def segments(walker, node, target, longest):
+    targets = walker.graph.targets
+    found = []
+    segment = []
+
+    def extend(node):
+        if segment and node == target:
+            found.append(list(segment))
+        if len(segment) == longest:
+            return
+        for e in walker.valid_edges(node):
+            walker.take(e)
+            segment.append(e)
+            extend(targets[e])
+            segment.pop()
+            walker.release(e)
+
+    extend(node)
+    return found
+
+
+# Function to reroute a middle segment of the path, returns whether the move was accepted
+#
+# The segment starts at a uniform position i of the path with a uniform length
+# d in 1 .. longest (the move is rejected if it runs past the end). The new one
+# of length d' changes the path length from L to L' = L - d + d', the reverse
+# move picks i out of L' positions, hence the factor L / L' of the acceptance.
+def reroute_segment(walker, longest):
+    length = walker.length
+    if length == 0:
+        return False
+    rng = walker.rng
+    i = rng.randrange(length)
+    j = i + 1 + rng.randrange(longest)
+    if j > length:
+        return False
+    old_weight = log_weight(walker)
+    edge_path = list(walker.edge_path)
+    old_segment = edge_path[i:j]
+
+    # The segments that fit the rest of the path, with the old one given back
+    for e in old_segment:
+        walker.release(e)
+    candidates = segments(walker, walker.path[i], walker.path[j], longest)
+    for e in old_segment:
+        walker.take(e)
+    segment = rng.choice(candidates)
+    if segment == old_segment:
+        return True
+
+    new_path = edge_path[:i] + segment + edge_path[j:]
+    walker.reset(new_path)
+    if walker.alive() and metropolis(rng, log_weight(walker) - old_weight + math.log(length / len(new_path))):
+        return True
+
+    # Rejected, back to the old path
+    walker.reset(edge_path)
+    return False
+
+
+# Function to make one bulk move, returns whether it was accepted
+def bulk_move(walker, bulk_moves):
+    regrow, reroute = bulk_moves.regrow, bulk_moves.reroute
+    if regrow and (not reroute or walker.rng.random() < 0.5):
+        return regrow_tail(walker, regrow)
+    if reroute:
+        return reroute_segment(walker, reroute)
+    return False
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from .graph import CompiledGraph, GraphTables, compile_graph, create_graph, replace_wormhole_destinations, scan_board
+
+# Directory of the cached graphs, relative to the working directory
+DEFAULT_CACHE_DIR = '.chilly_cache'
+
+# Binary layout of a cached graph, a new version invalidates all old files
+#
+# header: magic, version, byte order of the arrays (0 little, 1 big) and the sizes
+#         labels, nodes, edges, span cells, eggs, eggs on the edges, start, exit, distance table
+#         length, label bytes
+# int32 sections (native byte order): offsets, targets, span_offsets, span_cells, eggs,
+#         the GraphTables (sources, in_offsets, in_edges, egg_offsets, egg_ids), distances to the exit
+# byte sections: directions (one letter per edge), labels ('\n' separated, utf-8)
+MAGIC = b'CHILLYG'
+VERSION = 2
+HEADER = struct.Struct('<7sBB3x10i')
+
+
+# Function to compute the cache key of a playfield: hash of the grid and the wormhole mapping
+def graph_key(data, wormhole_mapping):
+    content = json.dumps([VERSION, list(data), sorted(wormhole_mapping.items())])
+    return hashlib.sha256(content.encode()).hexdigest()[:32]
+
+
+# Function to write a compiled graph (with its shortest path table to the exit) to a file
+#
+# The file is written next to its destination and moved in place, so a concurrent
+# reader never sees a half written graph.
+def save_graph(graph, path):
+    distances = graph.distances_to(graph.exit) if graph.exit >= 0 else array('i')
+    labels = '\n'.join(graph.labels).encode()
+    header = HEADER.pack(MAGIC, VERSION, sys.byteorder == 'big', len(graph.labels), graph.num_nodes,
+                         graph.num_edges, len(graph.span_cells), len(graph.eggs), len(graph.egg_ids), graph.start,
+                         graph.exit, len(distances), len(labels))
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as file:
+        file.write(header)
+        for section in (graph.offsets, graph.targets, graph.span_offsets, graph.span_cells, graph.eggs,
+                        *graph.tables(), distances):
+            file.write(array('i', section).tobytes())
+        file.write(graph.directions.encode('ascii'))
+        file.write(labels)
+    os.replace(temporary, path)
+
+
+# Function to open a cached graph, the int32 arrays stay views into the memory mapped file
+# (nothing is derived from them, the payloads are built on their first use).
+# Returns None if the file is missing, of another version or of another byte order.
+def open_graph(path):
+    try:
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):  # ValueError: empty file
+        return None
+    if len(mapped) < HEADER.size:
+        return None
+    (magic, version, big_endian, num_labels, num_nodes, num_edges, num_span_cells, num_eggs, num_egg_ids, start,
+     exit, num_distances, label_bytes) = HEADER.unpack_from(mapped)
+    if magic != MAGIC or version != VERSION or big_endian != (sys.byteorder == 'big'):
+        return None
+
+    view = memoryview(mapped)
+    position = HEADER.size
+
+    def ints(count):
+        nonlocal position
+        section = view[position:position + 4 * count].cast('i')
+        position += 4 * count
+        return section
+
+    offsets = ints(num_nodes + 1)
+    targets = ints(num_edges)
+    span_offsets = ints(num_edges + 1)
+    span_cells = ints(num_span_cells)
+    eggs = ints(num_eggs)
+    tables = GraphTables(ints(num_edges), ints(num_nodes + 1), ints(num_edges), ints(num_edges + 1),
+                         ints(num_egg_ids))
+    distances = ints(num_distances)
+    directions = bytes(view[position:position + num_edges]).decode('ascii')
+    position += num_edges
+    labels = bytes(view[position:position + label_bytes]).decode().split('\n') if num_labels else []
+
+    graph = CompiledGraph(labels, num_nodes, offsets, targets, directions, span_offsets, span_cells,
+                          start, exit, eggs, tables)
+    if num_distances:
+        graph.distance_tables[exit] = distances
+    graph.mapped_file = mapped  # Keep the mapping open as long as the graph lives
+    return graph
+
+
+# Function to get the compiled graph of a playfield from the cache, or build and store it
+#
+# The file name is the graph_key of the grid and the wormhole mapping, so every change
+# of the playfield gives a new file and restarting jobs on the same board skips
+# create_graph, the wormhole mapping and compile_graph. cells: the BoardCells of the
+# grid if already known (see scan_board).
+def load_graph(data, wormhole_mapping, cache_dir=DEFAULT_CACHE_DIR, cells=None):
+    path = os.path.join(cache_dir, f"{graph_key(data, wormhole_mapping)}.graph")
+    graph = open_graph(path)
+    if graph is not None:
+        return graph
+
+    if cells is None:
+        cells = scan_board(data)
+    graph = replace_wormhole_destinations(create_graph(data), wormhole_mapping)
+    compiled_graph = compile_graph(graph, cells.start, cells.exit, cells.eggs)
+    os.makedirs(cache_dir, exist_ok=True)
+    save_graph(compiled_graph, path)
+    return compiled_graph
@@ -0,0 +1,76 @@
+import json
+import os
+
+import numpy as np
+
+# Checkpoints of the long running samplers (ibi_walk, umbrella_walk)
+#
+# A checkpoint is one compressed .npz file with the sampler state as arrays:
+# the sampler name and the size of the graph it ran on, the edge ids of the
+# current path, the move and iteration counters, the histogram (and the bias U
+# of IBI) and the state of the random stream. It is written at the end of a
+# block of sweeps_per_check moves, so a resumed walk continues with exactly
+# the moves the interrupted walk would have made.
+
+
+# Function to write a checkpoint, to a temporary file next to it that is moved
+# in place, so a job killed while writing leaves the previous checkpoint intact
+def save_checkpoint(path, **arrays):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as file:
+        np.savez_compressed(file, **arrays)
+    os.replace(temporary, path)
+
+
+# Function to read a checkpoint as dict of arrays, None if there is none yet
+def load_checkpoint(path):
+    try:
+        with np.load(path) as data:
+            return {key: data[key] for key in data.files}
+    except FileNotFoundError:
+        return None
+
+
+# Function to get the state of a random.Random (or of the random module) as arrays,
+# a BlockRandom (see chilly/streams.py) stores its state dict as JSON
+def rng_arrays(rng):
+    state = rng.getstate()
+    if isinstance(state, dict):
+        return {'rng_block': np.array(json.dumps(state))}
+    version, internal_state, gauss_next = state
+    return {'rng_version': np.array(version),
+            'rng_state': np.array(internal_state, dtype=np.uint32),
+            'rng_gauss': np.array([] if gauss_next is None else [gauss_next])}
+
+
+# Function to set the state of a random.Random (or of the random module, or a BlockRandom) from a checkpoint
+def restore_rng(rng, state):
+    if 'rng_block' in state:
+        rng.setstate(json.loads(str(state['rng_block'])))
+        return
+    gauss = state['rng_gauss']
+    rng.setstate((int(state['rng_version']), tuple(int(word) for word in state['rng_state']),
+                  float(gauss[0]) if len(gauss) else None))
+
+
+# Function to describe the graph a walk runs on, a checkpoint only resumes on the same graph
+def graph_arrays(sampler, graph):
+    return {'sampler': np.array(sampler), 'graph': np.array([graph.num_nodes, graph.num_edges,
+                                                             graph.start, graph.exit])}
+
+
+# Function to check that a checkpoint was written by the sampler on the graph
+def check_checkpoint(state, sampler, graph):
+    expected = graph_arrays(sampler, graph)
+    if str(state['sampler']) != sampler or not np.array_equal(state['graph'], expected['graph']):
+        raise ValueError(f"Checkpoint of {state['sampler']} on graph {state['graph'].tolist()} does not match "
+                         f"{sampler} on graph {expected['graph'].tolist()}")
+
+
+# Function to read the learned bias U(L) of an IBI checkpoint, e.g. as initial_U of
+# ibi_walk on another board of similar size
+def load_bias(path):
+    state = load_checkpoint(path)
+    if state is None or 'U' not in state:
+        raise ValueError(f"{path} is not an IBI checkpoint")
+    return state['U']
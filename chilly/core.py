@@ -0,0 +1,669 @@
+import random
+from collections import Counter
+
+from .bulk import BulkMoves, bulk_move
+from .graph import EDGES_K_TIMES, EDGES_ONCE, NODES_ONCE
+from .reachability import ReachabilityOracle
+
+# Walker core shared by brute_force_walk, umbrella_walk, ibi_walk, WangLandau, the
+# replicas of ReplicaExchange and exit_guided_walk
+#
+# All of them make the same grow and reverse moves on the compiled graph and only
+# differ in the rule of the path (the constraint, Once or KTimes) and in the
+# acceptance of the moves (the bias, see Bias). run_moves is the move loop of all of
+# them, it takes both as objects and calls their hooks. The common cases run a copy
+# of it specialized once for the walker (see select_loop): brute_force_moves without
+# a bias and biased_moves with the accept hooks, both under the edge once or node
+# once rule without prune_dead, with the take and release of Once written inline
+# and no test for the hooks or the oracle on every move.
+
+
+class Once:
+    """Edge once and node once: the slot blocked_by an edge is visited while the edge is on the path.
+
+    free holds the free out edge mask of every node (see CompiledGraph.free_masks),
+    kept in step with the visited slots.
+    """
+
+    def __init__(self, graph, rule):
+        self.blocked_by = graph.blocked_by(rule)
+        self.visited = graph.new_visited(rule)
+        self.free = graph.free_masks()
+        self.slot_masks = graph.slot_masks(rule)
+
+    # Mark an edge as taken or given back in the visited slots and in the free masks
+    def take(self, e):
+        slot = self.blocked_by[e]
+        self.visited[slot] = 1
+        free = self.free
+        for node, bits in self.slot_masks[slot]:
+            free[node] &= ~bits
+
+    def release(self, e):
+        slot = self.blocked_by[e]
+        self.visited[slot] = 0
+        free = self.free
+        for node, bits in self.slot_masks[slot]:
+            free[node] |= bits
+
+
+class KTimes:
+    """Edge k times: uses counts the edge on the path, its slot is visited once it is used max_uses times."""
+
+    def __init__(self, graph, max_uses):
+        self.blocked_by = graph.blocked_by(EDGES_ONCE)
+        self.visited = graph.new_visited(EDGES_ONCE)
+        self.free = graph.free_masks()
+        self.source_bits = [(graph.sources[e], 1 << (e - graph.offsets[graph.sources[e]]))
+                            for e in range(graph.num_edges)]
+        self.uses = [0] * graph.num_edges
+        self.max_uses = max_uses
+
+    # Count the use of an edge, block it once it is used up
+    def take(self, e):
+        self.uses[e] += 1
+        if self.uses[e] == self.max_uses:
+            self.visited[self.blocked_by[e]] = 1
+            node, bit = self.source_bits[e]
+            self.free[node] &= ~bit
+
+    # Give the use of an edge back, it is free again
+    def release(self, e):
+        if self.uses[e] == self.max_uses:
+            self.visited[self.blocked_by[e]] = 0
+            node, bit = self.source_bits[e]
+            self.free[node] |= bit
+        self.uses[e] -= 1
+
+
+class Bias:
+    """No bias, every proposed move is taken: the brute force walk.
+
+    A bias plugs into the move loop of the Walker (see run_moves) with hooks,
+    subclasses define the ones they need (None skips the hook):
+
+    forward_accept(walker, next_edge, valid_moves): a move along next_edge is
+        proposed, its slot is already marked visited but the walker is still on
+        the path before the move, returns whether to take it
+    backward_accept(walker, last_edge, valid_moves): reversing last_edge is
+        proposed, its slot is already given back but the walker is still on
+        the path before the reverse, returns whether to reverse it
+    after_move(walker): at the end of every move, taken or not
+
+    valid_moves are the valid out edges of the current node before the move, as
+    positions among its out edges (offsets[node] + i is the edge id).
+    """
+
+    forward_accept = None
+    backward_accept = None
+    after_move = None
+
+    # The single moves sample a path with the weight (valid moves + 1) * exp(log_weight(length)),
+    # a bias with a Hastings correction of the backtracking proposal samples without the first factor
+    choice_weighted = True
+
+    # Log weight of a path length in the distribution the moves sample, for the bulk moves
+    def log_weight(self, length):
+        return 0.0
+
+    # Bookkeeping of the bias after every bulk move (accepted or not)
+    def after_bulk(self, walker):
+        pass
+
+
+# The move loop: continue the walk of a walker for a number of moves, return the solutions hit
+# on the way that are at least minimum_steps long and beat best.value (if best is given)
+#
+# The general loop, for every rule, bias and prune_dead: the Walker runs it with prune_dead,
+# under the edge k times rule and for biases with after_move, the other walks run one of
+# the specialized copies below (see Walker.select_loop), which make the same moves.
+def run_moves(walker, moves, minimum_steps, best=None):
+    # Local references to the CSR arrays of the compiled graph and to the random stream
+    graph = walker.graph
+    offsets = graph.offsets
+    targets = graph.targets
+    payloads = graph.payloads
+    end_node = graph.exit
+    num_eggs = len(graph.eggs)
+    random_float = walker.rng.random
+    choice = walker.rng.choice
+    oracle = walker.oracle
+
+    # The rule and the bias
+    constraint = walker.constraint
+    blocked_by = constraint.blocked_by  # Slot to mark as visited when taking an edge
+    take = constraint.take
+    release = constraint.release
+    bias = walker.bias
+    forward_accept = bias.forward_accept
+    backward_accept = bias.backward_accept
+    after_move = bias.after_move
+
+    # State of the walk: visited slots, node path, edge path, traversed cells and egg coverage
+    visited = constraint.visited
+    free = constraint.free  # Free out edge mask of every node
+    set_bits = graph.set_bits
+    path = walker.path
+    edge_path = walker.edge_path
+    all_traversed_nodes_path = walker.all_traversed_nodes_path
+    egg_counts = walker.egg_counts
+    collected_eggs = walker.collected_eggs
+    missing_eggs = walker.missing_eggs  # Bitmask of the eggs not collected yet
+    current_node = path[-1]
+
+    # Counters of the block, the forward moves follow from the backtracks and the path length
+    start_length = len(edge_path)
+    backtracks = dead_ends = pruned = bias_rejections = exit_visits = max_depth = 0
+
+    solutions = []
+    hits = []  # Move number of every solution, counted over all runs of the walker
+    for i in range(moves):
+        # Get the possible moves from the current node, the out edges with a free slot:
+        # the set bits of its free mask (no scan over the out edges)
+        valid_moves = set_bits[free[current_node]]
+
+        # Decide whether to move or reverse the last move
+        # Move or if no valid move, then reject every time
+        if random_float() > 1.0/(len(valid_moves) + 1):
+            # Randomly select a valid move and mark the edge (or the node) as visited
+            next_edge = offsets[current_node] + choice(valid_moves)
+            next_node = targets[next_edge]
+            payload = payloads[next_edge]
+            take(next_edge)
+            # The oracle follows the slots the move marks (edge k times: only once the edge is used up)
+            blocked = oracle is not None and visited[blocked_by[next_edge]]
+            if blocked:
+                oracle.block(blocked_by[next_edge])
+
+            if oracle is not None and not oracle.alive(next_node, missing_eggs & ~payload.egg_mask):
+                # Back out of a dead prefix at once (prune_dead, see ReachabilityOracle)
+                release(next_edge)
+                if blocked:
+                    oracle.unblock(blocked_by[next_edge])
+                pruned += 1
+            elif forward_accept is not None and not forward_accept(walker, next_edge, valid_moves):
+                release(next_edge)
+                if blocked:
+                    oracle.unblock(blocked_by[next_edge])
+                bias_rejections += 1
+            else:
+                # Update the traversed nodes for the edge: traversed nodes and the destination node
+                all_traversed_nodes_path.extend(payload.cells)
+
+                # Collect the eggs of the edge
+                for egg in payload.eggs:
+                    if egg_counts[egg] == 0:
+                        collected_eggs += 1
+                        missing_eggs &= ~(1 << egg)
+                    egg_counts[egg] += 1
+
+                # Move to the next node
+                path.append(next_node)
+                edge_path.append(next_edge)
+                current_node = next_node
+                if len(edge_path) > max_depth:
+                    max_depth = len(edge_path)
+
+                # Check for end-condition
+                if current_node == end_node:
+                    exit_visits += 1
+                    # Check if all eggs have been collected and the path beats the shared best one
+                    if len(edge_path) >= minimum_steps and collected_eggs == num_eggs and \
+                            (best is None or len(edge_path) > best.value):
+                        solutions.append((list(path), list(all_traversed_nodes_path), list(edge_path)))
+                        hits.append(walker.moves + i + 1)
+        else:
+            if not valid_moves:
+                dead_ends += 1
+
+            # No valid moves left, reverse the last move or if diced so
+            if edge_path:  # Ensure there is a previous node to go back to
+                # Mark the edge (or the node) as unvisited (reverse the last move)
+                last_edge = edge_path[-1]
+                freed = oracle is not None and visited[blocked_by[last_edge]]
+                release(last_edge)
+                if freed:
+                    oracle.unblock(blocked_by[last_edge])
+
+                if backward_accept is not None and not backward_accept(walker, last_edge, valid_moves):
+                    take(last_edge)
+                    if freed:
+                        oracle.block(blocked_by[last_edge])
+                    bias_rejections += 1
+                else:
+                    backtracks += 1
+                    edge_path.pop()
+                    payload = payloads[last_edge]  # Get the payload of the last edge
+
+                    # Remove the destination node and the traversed nodes
+                    del all_traversed_nodes_path[-len(payload.cells):]
+
+                    # Drop the eggs of the edge
+                    for egg in payload.eggs:
+                        egg_counts[egg] -= 1
+                        if egg_counts[egg] == 0:
+                            collected_eggs -= 1
+                            missing_eggs |= 1 << egg
+
+                    path.pop()  # Remove the last node from the path
+                    current_node = path[-1]  # Move back to the last node
+
+        if after_move is not None:
+            after_move(walker)
+
+    _end_block(walker, moves, start_length, collected_eggs, missing_eggs, max_depth, hits,
+               backtracks, dead_ends, pruned, bias_rejections, exit_visits)
+    return solutions
+
+
+# The move loop of the unbiased walk under the edge once or node once rule without prune_dead
+# (brute_force_walk): run_moves without the hooks, taking and giving back an edge are direct
+# writes of its slot and of the free masks of the edges it blocks (see Once)
+def brute_force_moves(walker, moves, minimum_steps, best=None):
+    # Local references to the CSR arrays of the compiled graph and to the random stream
+    graph = walker.graph
+    offsets = graph.offsets
+    targets = graph.targets
+    payloads = graph.payloads
+    end_node = graph.exit
+    num_eggs = len(graph.eggs)
+    set_bits = graph.set_bits
+    random_float = walker.rng.random
+    choice = walker.rng.choice
+
+    # State of the walk: visited slots, free masks, node path, edge path, traversed cells and egg coverage
+    constraint = walker.constraint
+    blocked_by = constraint.blocked_by
+    slot_masks = constraint.slot_masks
+    visited = constraint.visited
+    free = constraint.free
+    path = walker.path
+    edge_path = walker.edge_path
+    all_traversed_nodes_path = walker.all_traversed_nodes_path
+    egg_counts = walker.egg_counts
+    collected_eggs = walker.collected_eggs
+    missing_eggs = walker.missing_eggs
+    current_node = path[-1]
+
+    start_length = len(edge_path)
+    backtracks = dead_ends = exit_visits = max_depth = 0
+
+    solutions = []
+    hits = []
+    for i in range(moves):
+        valid_moves = set_bits[free[current_node]]
+        if random_float() > 1.0/(len(valid_moves) + 1):
+            # Take a random valid move
+            next_edge = offsets[current_node] + choice(valid_moves)
+            slot = blocked_by[next_edge]
+            visited[slot] = 1
+            for node, bits in slot_masks[slot]:
+                free[node] &= ~bits
+
+            payload = payloads[next_edge]
+            all_traversed_nodes_path.extend(payload.cells)
+            for egg in payload.eggs:
+                if egg_counts[egg] == 0:
+                    collected_eggs += 1
+                    missing_eggs &= ~(1 << egg)
+                egg_counts[egg] += 1
+            current_node = targets[next_edge]
+            path.append(current_node)
+            edge_path.append(next_edge)
+            if len(edge_path) > max_depth:
+                max_depth = len(edge_path)
+
+            if current_node == end_node:
+                exit_visits += 1
+                if len(edge_path) >= minimum_steps and collected_eggs == num_eggs and \
+                        (best is None or len(edge_path) > best.value):
+                    solutions.append((list(path), list(all_traversed_nodes_path), list(edge_path)))
+                    hits.append(walker.moves + i + 1)
+        else:
+            if not valid_moves:
+                dead_ends += 1
+
+            # Reverse the last move
+            if edge_path:
+                backtracks += 1
+                last_edge = edge_path.pop()
+                slot = blocked_by[last_edge]
+                visited[slot] = 0
+                for node, bits in slot_masks[slot]:
+                    free[node] |= bits
+
+                payload = payloads[last_edge]
+                del all_traversed_nodes_path[-len(payload.cells):]
+                for egg in payload.eggs:
+                    egg_counts[egg] -= 1
+                    if egg_counts[egg] == 0:
+                        collected_eggs -= 1
+                        missing_eggs |= 1 << egg
+                path.pop()
+                current_node = path[-1]
+
+    _end_block(walker, moves, start_length, collected_eggs, missing_eggs, max_depth, hits,
+               backtracks, dead_ends, 0, 0, exit_visits)
+    return solutions
+
+
+# The move loop of a bias with forward_accept and backward_accept (and no after_move) under the
+# edge once or node once rule without prune_dead: run_moves with the hooks called unconditionally
+# and the edges taken and given back like in brute_force_moves
+def biased_moves(walker, moves, minimum_steps, best=None):
+    # Local references to the CSR arrays of the compiled graph and to the random stream
+    graph = walker.graph
+    offsets = graph.offsets
+    targets = graph.targets
+    payloads = graph.payloads
+    end_node = graph.exit
+    num_eggs = len(graph.eggs)
+    set_bits = graph.set_bits
+    random_float = walker.rng.random
+    choice = walker.rng.choice
+    forward_accept = walker.bias.forward_accept
+    backward_accept = walker.bias.backward_accept
+
+    # State of the walk: visited slots, free masks, node path, edge path, traversed cells and egg coverage
+    constraint = walker.constraint
+    blocked_by = constraint.blocked_by
+    slot_masks = constraint.slot_masks
+    visited = constraint.visited
+    free = constraint.free
+    path = walker.path
+    edge_path = walker.edge_path
+    all_traversed_nodes_path = walker.all_traversed_nodes_path
+    egg_counts = walker.egg_counts
+    collected_eggs = walker.collected_eggs
+    missing_eggs = walker.missing_eggs
+    current_node = path[-1]
+
+    start_length = len(edge_path)
+    backtracks = dead_ends = bias_rejections = exit_visits = max_depth = 0
+
+    solutions = []
+    hits = []
+    for i in range(moves):
+        valid_moves = set_bits[free[current_node]]
+        if random_float() > 1.0/(len(valid_moves) + 1):
+            # Propose a random valid move, its slot is taken before the bias decides
+            next_edge = offsets[current_node] + choice(valid_moves)
+            slot = blocked_by[next_edge]
+            visited[slot] = 1
+            for node, bits in slot_masks[slot]:
+                free[node] &= ~bits
+            if not forward_accept(walker, next_edge, valid_moves):
+                visited[slot] = 0
+                for node, bits in slot_masks[slot]:
+                    free[node] |= bits
+                bias_rejections += 1
+                continue
+
+            payload = payloads[next_edge]
+            all_traversed_nodes_path.extend(payload.cells)
+            for egg in payload.eggs:
+                if egg_counts[egg] == 0:
+                    collected_eggs += 1
+                    missing_eggs &= ~(1 << egg)
+                egg_counts[egg] += 1
+            current_node = targets[next_edge]
+            path.append(current_node)
+            edge_path.append(next_edge)
+            if len(edge_path) > max_depth:
+                max_depth = len(edge_path)
+
+            if current_node == end_node:
+                exit_visits += 1
+                if len(edge_path) >= minimum_steps and collected_eggs == num_eggs and \
+                        (best is None or len(edge_path) > best.value):
+                    solutions.append((list(path), list(all_traversed_nodes_path), list(edge_path)))
+                    hits.append(walker.moves + i + 1)
+        else:
+            if not valid_moves:
+                dead_ends += 1
+
+            # Propose to reverse the last move, its slot is given back before the bias decides
+            if edge_path:
+                last_edge = edge_path[-1]
+                slot = blocked_by[last_edge]
+                visited[slot] = 0
+                for node, bits in slot_masks[slot]:
+                    free[node] |= bits
+                if not backward_accept(walker, last_edge, valid_moves):
+                    visited[slot] = 1
+                    for node, bits in slot_masks[slot]:
+                        free[node] &= ~bits
+                    bias_rejections += 1
+                    continue
+
+                backtracks += 1
+                edge_path.pop()
+                payload = payloads[last_edge]
+                del all_traversed_nodes_path[-len(payload.cells):]
+                for egg in payload.eggs:
+                    egg_counts[egg] -= 1
+                    if egg_counts[egg] == 0:
+                        collected_eggs -= 1
+                        missing_eggs |= 1 << egg
+                path.pop()
+                current_node = path[-1]
+
+    _end_block(walker, moves, start_length, collected_eggs, missing_eggs, max_depth, hits,
+               backtracks, dead_ends, 0, bias_rejections, exit_visits)
+    return solutions
+
+
+# Function to pick the move loop of a walker: the general run_moves with prune_dead, under the
+# edge k times rule, for a bias with after_move or with only one of the accept hooks, else
+# brute_force_moves without a bias and biased_moves with both accept hooks
+def select_loop(walker):
+    bias = walker.bias
+    if walker.oracle is not None or type(walker.constraint) is not Once or bias.after_move is not None:
+        return run_moves
+    if bias.forward_accept is None and bias.backward_accept is None:
+        return brute_force_moves
+    if bias.forward_accept is not None and bias.backward_accept is not None:
+        return biased_moves
+    return run_moves
+
+
+# Function to hand the state and the counters of a block of moves back to the walker
+def _end_block(walker, moves, start_length, collected_eggs, missing_eggs, max_depth, hits,
+               backtracks, dead_ends, pruned, bias_rejections, exit_visits):
+    walker.collected_eggs = collected_eggs
+    walker.missing_eggs = missing_eggs
+    walker.max_depth = max_depth
+    walker.moves += moves
+    walker.hits = hits
+    walker.block_counts = {'attempted': moves, 'accepted': backtracks + len(walker.edge_path) - start_length,
+                           'backtracks': backtracks, 'dead_ends': dead_ends, 'pruned': pruned,
+                           'bias_rejections': bias_rejections, 'exit_visits': exit_visits}
+
+
+# Function to get the module of the compiled move loop, None without NumPy or Numba (the Python loop runs then)
+def _compiled_loop():
+    try:
+        from . import jit
+    except ImportError:
+        return None
+    return jit if jit.HAVE_NUMBA else None
+
+
+class Walker:
+    """Grow and reverse walker on a compiled graph with a pluggable rule and bias.
+
+    The rule is EDGES_ONCE, NODES_ONCE or EDGES_K_TIMES (every edge at most
+    max_uses times), the bias a Bias (None walks unbiased like brute_force_walk,
+    see UmbrellaBias, IBIBias, WangLandau, Replica and ExitGuidedBias for the
+    others). prune_dead rejects every move into a prefix from which the exit or
+    a missing egg can no longer be reached (see ReachabilityOracle). run() walks
+    a number of moves with the move loop picked for the walker (see select_loop)
+    and returns the solutions hit on the way as (path, all_traversed_nodes_path,
+    edge_path), the state carries over to the next run. hits holds the move number
+    of every solution of the last run, counted over all runs in moves. The bias
+    can be replaced between two runs. bulk_moves (BulkMoves or a tuple of its
+    fields) adds a tail regrowth or segment reroute after every interval single
+    moves (see chilly/bulk.py). jit runs the unbiased, umbrella and IBI walk under
+    the edge once or node once rule with the Numba compiled move loop if Numba is
+    installed (see chilly/jit.py), move for move like the Python loop.
+    """
+
+    def __init__(self, graph, rule=EDGES_ONCE, bias=None, rng=random, prune_dead=False, max_uses=2,
+                 bulk_moves=None, jit=False):
+        self.graph = graph
+        self.rule = rule
+        if rule == EDGES_K_TIMES:
+            self.constraint = KTimes(graph, max_uses)
+        elif rule in (EDGES_ONCE, NODES_ONCE):
+            self.constraint = Once(graph, rule)
+        else:
+            raise ValueError(f"Unknown rule {rule!r}, expected {EDGES_ONCE!r}, {NODES_ONCE!r} or {EDGES_K_TIMES!r}")
+        self.visited_rule = EDGES_ONCE if rule == EDGES_K_TIMES else rule
+        self.blocked_by = self.constraint.blocked_by  # Slot to mark when an edge is taken
+        self.visited = self.constraint.visited  # Visited edges (or nodes, or used up edges)
+        self.free = self.constraint.free  # Free out edge mask of every node
+        # Mark an edge as taken or given back in the visited slots only, e.g. to look at the moves
+        # without it (the oracle follows push and pop, the slots have to be back before the next one)
+        self.take = self.constraint.take
+        self.release = self.constraint.release
+        self.max_uses = max_uses
+        self.rng = rng
+        self.oracle = ReachabilityOracle(graph, self.visited_rule, self.visited) if prune_dead else None
+        self.bias = bias if bias is not None else Bias()  # Picks the move loop as well
+        self.bulk_moves = None if bulk_moves is None else BulkMoves(*bulk_moves)
+        self.jit = _compiled_loop() if jit else None
+        self.jit_arrays = None  # The graph as arrays for the compiled move loop
+
+        # Longest possible path: every edge at most once (or max_uses times)
+        self.max_length = graph.num_edges * (max_uses if rule == EDGES_K_TIMES else 1)
+
+        # The empty path at the start
+        self.path = [graph.start]
+        self.edge_path = []
+        self.all_traversed_nodes_path = [graph.start]
+        self.egg_counts = [0] * len(graph.eggs)
+        self.collected_eggs = 0
+        self.missing_eggs = (1 << len(graph.eggs)) - 1
+
+        # Single moves made over all runs and the move numbers of the solutions of the last run
+        self.moves = 0
+        self.hits = []
+
+        # Counters of the last run, for the telemetry
+        self.max_depth = 0
+        self.block_counts = {}
+
+    # The bias, setting it (at the start or between two runs) picks the move loop for it
+    @property
+    def bias(self):
+        return self._bias
+
+    @bias.setter
+    def bias(self, bias):
+        self._bias = bias
+        self.move_loop = select_loop(self)
+
+    @property
+    def length(self):
+        return len(self.edge_path)
+
+    # Set the walker onto a path given by its edge ids (the empty path by default), e.g. the
+    # path of a checkpoint: back to the common prefix with the current path, then along the rest
+    def reset(self, edge_path=()):
+        edge_path = list(edge_path)
+        common = 0
+        for old, new in zip(self.edge_path, edge_path):
+            if old != new:
+                break
+            common += 1
+        while len(self.edge_path) > common:
+            self.pop()
+        for e in edge_path[common:]:
+            self.push(e)
+
+    # Edge ids the walker can take from a node
+    def valid_edges(self, node):
+        offset = self.graph.offsets[node]
+        return [offset + i for i in self.graph.set_bits[self.free[node]]]
+
+    # Move along an edge and reverse the last move, outside of the move loop (e.g. for the bulk moves)
+    def push(self, e):
+        self.take(e)
+        if self.oracle is not None and self.visited[self.blocked_by[e]]:
+            self.oracle.block(self.blocked_by[e])
+        payload = self.graph.payloads[e]
+        self.all_traversed_nodes_path.extend(payload.cells)
+        for egg in payload.eggs:
+            if self.egg_counts[egg] == 0:
+                self.collected_eggs += 1
+                self.missing_eggs &= ~(1 << egg)
+            self.egg_counts[egg] += 1
+        self.path.append(self.graph.targets[e])
+        self.edge_path.append(e)
+
+    def pop(self):
+        e = self.edge_path.pop()
+        freed = self.oracle is not None and self.visited[self.blocked_by[e]]
+        self.release(e)
+        if freed:
+            self.oracle.unblock(self.blocked_by[e])
+        payload = self.graph.payloads[e]
+        del self.all_traversed_nodes_path[-len(payload.cells):]
+        for egg in payload.eggs:
+            self.egg_counts[egg] -= 1
+            if self.egg_counts[egg] == 0:
+                self.collected_eggs -= 1
+                self.missing_eggs |= 1 << egg
+        self.path.pop()
+        return e
+
+    # Check if the current state can still end in a solution (always without prune_dead)
+    def alive(self):
+        return self.oracle is None or self.oracle.alive(self.path[-1], self.missing_eggs)
+
+    # The current path as solution if it is one: at the exit with all eggs, at least minimum_steps
+    # long and longer than best.value (if best is given)
+    def solution(self, minimum_steps, best=None):
+        edge_path = self.edge_path
+        if self.path[-1] == self.graph.exit and self.collected_eggs == len(self.graph.eggs) and \
+                len(edge_path) >= minimum_steps and (best is None or len(edge_path) > best.value):
+            return list(self.path), list(self.all_traversed_nodes_path), list(edge_path)
+        return None
+
+    # Perform a number of moves, return the solutions hit on the way that are at least
+    # minimum_steps long and beat best.value (if best is given)
+    def run(self, moves, minimum_steps, best=None):
+        if self.jit is not None and self.jit.supported(self):
+            run = self.jit.run
+        else:
+            run = self.move_loop
+        if self.bulk_moves is None:
+            return run(self, moves, minimum_steps, best)
+
+        # A bulk move after every interval single moves, the counters add up over the blocks
+        solutions = []
+        hits = []
+        counts = Counter()
+        max_depth = 0
+        interval = self.bulk_moves.interval
+        for done in range(0, moves, interval):
+            block = min(interval, moves - done)
+            solutions.extend(run(self, block, minimum_steps, best))
+            hits.extend(self.hits)
+            counts.update(self.block_counts)
+            max_depth = max(max_depth, self.max_depth)
+            if block < interval:
+                break
+            counts['bulk_attempted'] += 1
+            if bulk_move(self, self.bulk_moves):
+                counts['bulk_accepted'] += 1
+                max_depth = max(max_depth, self.length)
+                solution = self.solution(minimum_steps, best)
+                if solution is not None:
+                    solutions.append(solution)
+                    hits.append(self.moves)
+            self.bias.after_bulk(self)
+        self.max_depth = max_depth
+        self.hits = hits
+        self.block_counts = dict(counts)
+        return solutions
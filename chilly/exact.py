@@ -0,0 +1,124 @@
+import sys
+import time
+from collections import namedtuple
+
+from .graph import EDGES_ONCE, NODES_ONCE
+
+# Result of the exact search: the longest solution (length and edge ids, None and []
+# if there is none), the number of visited states of the search tree and whether
+# the search ran to the end, so that length is a proven optimum
+ExactSolution = namedtuple('ExactSolution', ['length', 'edges', 'search_nodes', 'proven'])
+
+
+# Exact longest path by depth first search with branch and bound
+#
+# Every path from the start under the rule is enumerated (like the walkers, a path
+# may pass through the exit and go on), the longest one that ends at the exit with
+# all eggs collected is returned. A state is pruned if
+# - the same node and visited set were reached before with a superset of its eggs
+#   (dominated state, the future moves are the same),
+# - the exit or one of the missing eggs cannot be reached over the unvisited edges,
+# - the number of unvisited edges (or nodes) reachable from it cannot beat the best length.
+#
+# lower_bound: length of a known solution (e.g. from Monte Carlo), only longer ones are searched
+# max_nodes, time_limit: give up after that many states or seconds, proven is False then
+# memo_limit: maximal number of stored states for the dominance check
+def longest_path(graph, rule=EDGES_ONCE, lower_bound=0, max_nodes=None, time_limit=None,
+                 memo_limit=5000000):
+    # Local references to the CSR arrays of the compiled graph
+    offsets = graph.offsets
+    targets = graph.targets
+    egg_masks = [payload.egg_mask for payload in graph.payloads]
+    blocked_by = graph.blocked_by(rule)
+    visited = graph.new_visited(rule)  # Visited slots of the current path (see CompiledGraph.blocked_by)
+    end_node = graph.exit
+    all_eggs = (1 << len(graph.eggs)) - 1
+    count_nodes = rule == NODES_ONCE
+
+    best_length = lower_bound - 1
+    best_edges = []
+    edge_path = []
+    memo = {}  # (node, visited) -> egg masks reached with
+    search_nodes = 0
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+
+    # Upper bound of the remaining steps, eggs still reachable and reachability of the exit,
+    # by a flood fill over the unvisited edges (every node is expanded once, so every
+    # reachable edge is counted once)
+    def reachable(node):
+        reached_edges = 0
+        reached_nodes = {node}
+        step_targets = set()
+        eggs = 0
+        exit_reached = False
+        frontier = [node]
+        while frontier:
+            n = frontier.pop()
+            for e in range(offsets[n], offsets[n + 1]):
+                if visited[blocked_by[e]]:
+                    continue
+                reached_edges += 1
+                eggs |= egg_masks[e]
+                target = targets[e]
+                exit_reached = exit_reached or target == end_node
+                step_targets.add(target)
+                if target not in reached_nodes:
+                    reached_nodes.add(target)
+                    frontier.append(target)
+        steps = len(step_targets) if count_nodes else reached_edges
+        return steps, eggs, exit_reached
+
+    class _SearchLimit(Exception):
+        pass
+
+    def search(node, eggs):
+        nonlocal best_length, best_edges, search_nodes
+        search_nodes += 1
+        if max_nodes is not None and search_nodes > max_nodes:
+            raise _SearchLimit()
+        if deadline is not None and search_nodes & 0xfff == 0 and time.monotonic() > deadline:
+            raise _SearchLimit()
+
+        length = len(edge_path)
+        if node == end_node and eggs == all_eggs and length > best_length:
+            best_length = length
+            best_edges = list(edge_path)
+
+        # Dominance: the same position with at least these eggs was already searched
+        key = (node, bytes(visited))
+        seen = memo.get(key)
+        if seen is not None:
+            for mask in seen:
+                if mask | eggs == mask:
+                    return
+            seen.append(eggs)
+        elif len(memo) < memo_limit:
+            memo[key] = [eggs]
+
+        steps, reachable_eggs, exit_reached = reachable(node)
+        if not exit_reached or (eggs | reachable_eggs) != all_eggs or length + steps <= best_length:
+            return
+
+        for e in range(offsets[node], offsets[node + 1]):
+            slot = blocked_by[e]
+            if visited[slot]:
+                continue
+            visited[slot] = 1
+            edge_path.append(e)
+            search(targets[e], eggs | egg_masks[e])
+            edge_path.pop()
+            visited[slot] = 0
+
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursion_limit, graph.num_edges + 100))
+    try:
+        search(graph.start, 0)
+        proven = True
+    except _SearchLimit:
+        proven = False
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+
+    if not best_edges:
+        return ExactSolution(None, [], search_nodes, proven)
+    return ExactSolution(best_length, best_edges, search_nodes, proven)
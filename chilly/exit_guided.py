@@ -0,0 +1,212 @@
+import math
+import random
+from collections import Counter, deque
+
+from .core import Bias, Walker
+from .graph import EDGES_ONCE
+
+
+# Function to find the shortest route from the end of the path of a walker to the exit over
+# the edges the walker can take (see Walker.valid_edges)
+#
+# Greedy descent along the precomputed exit distances first (optimal if every step is free),
+# BFS over the free edges otherwise. The route is a deterministic function of (node, visited),
+# which the truncate move relies on. Returns the edge ids, [] at the exit, None if cut off.
+def route_to_exit(walker, distances):
+    graph = walker.graph
+    offsets = graph.offsets
+    targets = graph.targets
+    blocked_by = walker.blocked_by
+    visited = walker.visited
+    end_node = graph.exit
+    node = walker.path[-1]
+    if distances[node] < 0:
+        return None
+
+    # Descend the distance table, a shortest route has distinct nodes and edges
+    route = []
+    current_node = node
+    while current_node != end_node:
+        goal = distances[current_node] - 1
+        for e in range(offsets[current_node], offsets[current_node + 1]):
+            if not visited[blocked_by[e]] and distances[targets[e]] == goal:
+                route.append(e)
+                current_node = targets[e]
+                break
+        else:
+            break
+    else:
+        return route
+
+    # BFS over the free edges, lowest edge ids first
+    parent_edge = {node: -1}
+    queue = deque([node])
+    while queue:
+        n = queue.popleft()
+        for e in range(offsets[n], offsets[n + 1]):
+            target = targets[e]
+            if visited[blocked_by[e]] or target in parent_edge:
+                continue
+            parent_edge[target] = e
+            if target == end_node:
+                route = []
+                while target != node:
+                    e = parent_edge[target]
+                    route.append(e)
+                    target = graph.sources[e]
+                route.reverse()
+                return route
+            queue.append(target)
+    return None
+
+
+class ExitGuidedBias(Bias):
+    """Metropolis-Hastings acceptance of the local moves of exit_guided_walk, for the Walker (see chilly/core.py).
+
+    A move from length L to L' is accepted with min(1, exp(invkT * (L' - L)) * (n+1)/(n'+1)),
+    where n and n' are the numbers of valid moves before and after the move (the
+    Hastings correction of the backtracking proposal), so the walk samples the paths
+    with the weight exp(invkT * L).
+    """
+
+    def __init__(self, graph, invkT=0.0):
+        self.invkT = invkT
+
+        # ln(n + 1) for n valid moves
+        max_degree = max((graph.offsets[n + 1] - graph.offsets[n] for n in range(graph.num_nodes)), default=0)
+        self.log_choices = [math.log(n + 1) for n in range(max_degree + 1)]
+
+    # Hooks of the move loop of the Walker, the moves are taken or given back in the visited slots already
+    def forward_accept(self, walker, next_edge, valid_moves):
+        next_moves = walker.valid_edges(walker.graph.targets[next_edge])
+        ln_accept = self.invkT + self.log_choices[len(valid_moves)] - self.log_choices[len(next_moves)]
+        return ln_accept >= 0 or walker.rng.random() < math.exp(ln_accept)
+
+    def backward_accept(self, walker, last_edge, valid_moves):
+        previous_moves = walker.valid_edges(walker.path[-2])
+        ln_accept = -self.invkT + self.log_choices[len(valid_moves)] - self.log_choices[len(previous_moves)]
+        return ln_accept >= 0 or walker.rng.random() < math.exp(ln_accept)
+
+    choice_weighted = False
+
+    def log_weight(self, length):
+        return self.invkT * length
+
+
+# Monte Carlo walk with exit guided moves on the compiled graph
+#
+# Metropolis-Hastings walk over the paths from the start with the weight
+# exp(invkT * L) (invkT = 0: every path equally likely). Two kinds of moves:
+# - local (probability 1 - splice_probability): the grow and reverse moves of
+#   brute_force_walk with the Hastings correction (n+1)/(n'+1) of the valid moves
+#   (the Walker of chilly/core.py with an ExitGuidedBias),
+# - splice (probability splice_probability): with probability 1/2 extend the
+#   path by route_to_exit, accepted with min(1, exp(invkT * k) / L') for k new
+#   steps and the new length L', else cut the path at a random position j < L
+#   and accept with min(1, L * exp(-invkT * k)) if the cut off k steps are exactly
+#   the route to the exit from position j (the reverse of an extension).
+# The local moves between two splice moves run in one go on the Walker, their
+# number is drawn from the geometric distribution of the splice probability.
+# Every extension proposal is scored as a candidate solution whether it is
+# accepted or not, so every splice move tests a complete path from the start to
+# the exit. Solutions (local or spliced) are yielded like in brute_force_walk,
+# rng, best, stop, max_moves, check_interval, prune_dead and max_uses have the same meaning.
+# With prune_dead the dead prefixes get weight zero, so moves into them are rejected
+# (a prefix of a live path is always alive, so reverse and cut moves need no check).
+# telemetry: Telemetry (see chilly/telemetry.py) that gets the counters of every block
+#            like in brute_force_walk, with the rejected moves and the accepted splices and cuts
+def exit_guided_walk(graph, minimum_steps, rule=EDGES_ONCE, splice_probability=0.1, invkT=0.0,
+                     rng=random, best=None, stop=None, max_moves=None, check_interval=100000,
+                     prune_dead=False, telemetry=None, max_uses=2):
+    walker = Walker(graph, rule, ExitGuidedBias(graph, invkT), rng, prune_dead, max_uses)
+    payloads = graph.payloads
+    num_eggs = len(graph.eggs)
+    distances = graph.distances_to(graph.exit)  # Steps to the exit, computed once per walk
+
+    # Boltzmann factor of one step and ln of the probability of a local move
+    step_weight = math.exp(invkT)
+    log_local = math.log(1.0 - splice_probability) if 0.0 < splice_probability < 1.0 else None
+
+    moves = 0
+    while max_moves is None or moves < max_moves:
+        if stop is not None and stop.is_set():
+            return
+        sweeps = check_interval if max_moves is None else min(check_interval, max_moves - moves)
+        moves += sweeps
+
+        # Counters of the block: the ones of the local moves, and of the splice moves on top
+        counts = Counter()
+        max_depth = 0
+        splices = cuts = 0
+
+        remaining = sweeps
+        while remaining > 0:
+            # Local moves up to the next splice move
+            if log_local is not None:
+                local = min(int(math.log(1.0 - rng.random()) / log_local), remaining)
+            else:
+                local = remaining if splice_probability <= 0.0 else 0
+            if local:
+                solutions = walker.run(local, minimum_steps, best)
+                counts.update(walker.block_counts)
+                max_depth = max(max_depth, walker.max_depth)
+                remaining -= local
+                for path, all_traversed_nodes_path, edge_path in solutions:
+                    # The shared best one may have grown since the solution was hit
+                    if best is None or len(edge_path) > best.value:
+                        yield path, all_traversed_nodes_path, edge_path
+                if not remaining:
+                    break
+
+            remaining -= 1
+            counts['attempted'] += 1
+            if rng.random() < 0.5:
+                # Extend the path by the shortest free route to the exit
+                route = route_to_exit(walker, distances)
+                if not route:
+                    continue
+                new_length = walker.length + len(route)
+
+                # Score the candidate: all eggs on the path or on the route
+                if new_length >= minimum_steps and (best is None or new_length > best.value):
+                    route_eggs = 0
+                    for e in route:
+                        route_eggs |= payloads[e].egg_mask
+                    if all(walker.egg_counts[egg] or route_eggs >> egg & 1 for egg in range(num_eggs)):
+                        candidate = walker.edge_path + route
+                        yield graph.nodes_of(candidate), graph.cells_of(candidate), candidate
+
+                if rng.random() >= step_weight**len(route) / new_length:
+                    counts['bias_rejections'] += 1
+                    continue
+                for e in route:
+                    walker.push(e)
+                if not walker.alive():
+                    for _ in route:
+                        walker.pop()
+                    counts['pruned'] += 1
+                    continue
+                splices += 1
+                counts['exit_visits'] += 1
+                max_depth = max(max_depth, walker.length)
+            else:
+                # Cut the path, only the reverse of an extension ends at the exit
+                if walker.path[-1] != graph.exit or not walker.length:
+                    continue
+                length = walker.length
+                cut = rng.randrange(length)
+                tail = walker.edge_path[cut:]
+                for _ in tail:
+                    walker.pop()
+                accepted = route_to_exit(walker, distances) == tail
+                if accepted and rng.random() >= length / step_weight**len(tail):
+                    counts['bias_rejections'] += 1
+                    accepted = False
+                if not accepted:
+                    for e in tail:
+                        walker.push(e)
+                    continue
+                cuts += 1
+
+        if telemetry is not None:
+            telemetry.block('exit_guided', moves, walker.length, max_depth, splices=splices, cuts=cuts, **counts)
@@ -0,0 +1,525 @@
+import gc
+import operator
+from array import array
+from collections import defaultdict, deque, namedtuple
+
+# Function to create the graph based on WSAD movement with longest empty cells and periodic boundaries
+#
+# Sweep line construction: every row and every column is scanned once for the next
+# stopping cell in each direction, all cells of a run share the same destination and
+# their traversed cells are slices of the labels of the line. The result is the same
+# as the one of create_graph_by_rays, which is used for grids with rows of unequal length.
+def create_graph(data):
+    rows = len(data)
+    cols = len(data[0]) if rows else 0
+    if any(len(line) != cols for line in data):
+        return create_graph_by_rays(data)
+
+    labels = [[f"({r}, {c})" for c in range(cols)] for r in range(rows)]  # Same as str((r, c))
+
+    # Millions of small containers, the cyclic garbage collector has nothing to find in them
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        # Moves of every line in bulk: (U, D) per column indexed by row, (L, R) per row indexed by column
+        column_moves = [_line_moves([data[r][c] for r in range(rows)], [labels[r][c] for r in range(rows)], 'UD')
+                        for c in range(cols)]
+        row_moves = [_line_moves(data[r], labels[r], 'LR') for r in range(rows)]
+
+        # Create a graph as a dictionary, nodes in row major order and moves in the order U, D, L, R
+        graph = defaultdict(list)
+        for r in range(rows):
+            left, right = row_moves[r]
+            for c in range(cols):
+                up, down = column_moves[c]
+                edges = [move for move in (up[r], down[r], left[c], right[c]) if move is not None]
+                if edges:
+                    graph[labels[r][c]] = edges
+    finally:
+        if collecting:
+            gc.enable()
+
+    return graph
+
+# Function to find the moves of every cell of a periodic line in both directions
+#
+# ' ', '$' and 'P' are slid over, 'X' and 'O' stop the slide on them, every other
+# cell stops it in front of it. All start cells in front of the same stopping cell
+# share the destination and their traversed cells are slices of the line labels.
+# Returns the (destination, direction, traversed) lists for sliding to lower and to
+# higher indices, None where no move is possible (or the cell is no start).
+def _line_moves(line, line_labels, directions):
+    n = len(line)
+    stoppers = [i for i in range(n) if line[i] not in ' $P']
+    if not stoppers:
+        raise ValueError("A row or column without obstacle, exit or wormhole would slide forever")
+    backward = [None] * n
+    forward = [None] * n
+    to_lower, to_higher = directions
+
+    # Next stopping cell after every position (periodic): scan backward from the end,
+    # the first stopping cell of the line follows the last position
+    next_stop = stoppers[0]
+    for i in range(n - 1, -1, -1):
+        if line[i] in ' $PO':
+            k = next_stop
+            destination = k if line[k] in 'XO' else (k - 1) % n
+            if destination > i:
+                forward[i] = (line_labels[destination], to_higher, line_labels[i + 1:destination])
+            elif destination < i:
+                forward[i] = (line_labels[destination], to_higher, line_labels[i + 1:] + line_labels[:destination])
+        if line[i] not in ' $P':
+            next_stop = i
+
+    # Previous stopping cell before every position (periodic): scan forward from the start
+    previous_stop = stoppers[-1]
+    for i in range(n):
+        if line[i] in ' $PO':
+            k = previous_stop
+            destination = k if line[k] in 'XO' else (k + 1) % n
+            if destination < i:
+                backward[i] = (line_labels[destination], to_lower, line_labels[destination + 1:i][::-1])
+            elif destination > i:
+                backward[i] = (line_labels[destination], to_lower,
+                               line_labels[:i][::-1] + line_labels[destination + 1:][::-1])
+        if line[i] not in ' $P':
+            previous_stop = i
+
+    return backward, forward
+
+# Function to create the graph by walking a ray from every valid field in all four directions
+def create_graph_by_rays(data):
+    # Create a list to hold the coordinates of empty fields and '$'
+    valid_fields = []
+
+    # Parse the grid and find valid fields
+    # ' ': empty
+    # '$': egg
+    # 'P': player
+    # 'O': wormhole
+    for r in range(len(data)):
+        for c in range(len(data[r])):
+            if data[r][c] == ' ' or data[r][c] == '$' or data[r][c] == 'P' or data[r][c] == 'O':
+                valid_fields.append((r, c))
+
+    # Create a graph as a dictionary
+    graph = defaultdict(list)
+
+    # Directions for WSAD movement (up, down, left, right)
+    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # (row_change, col_change)
+
+    # Create connections based on longest WSAD movement with periodic boundaries
+    for r, c in valid_fields: # Possible start positions: ' ', '$', 'P', 'O'
+        for dr, dc in directions:
+            # Start from the current position
+            nr, nc = r, c
+            traversed_nodes = []  # To collect all traversed nodes
+
+            # Move in the direction until hitting a wall or non-empty cell
+            while True:
+                nr += dr
+                nc += dc
+
+                # Apply periodic boundary conditions
+                nr = nr % len(data)  # Wrap around rows
+                nc = nc % len(data[nr])  # Wrap around columns
+
+                # Check if the new position is valid
+                # (empty or '$', 'P', 'O')
+                if data[nr][nc] == ' ' or data[nr][nc] == '$' or data[nr][nc] == 'P':
+                    traversed_nodes.append(f'({nr}, {nc})')  # Collect traversed node
+                    continue  # Keep moving in this direction
+                elif data[nr][nc] == 'X'  or data[nr][nc] == 'O':
+                    # hit the exit 'X' or wormhole -> stops the move
+                    nr += dr
+                    nc += dc
+
+                    # Apply periodic boundary conditions
+                    nr = nr % len(data)  # Wrap around rows
+                    nc = nc % len(data[nr])  # Wrap around columns
+                    traversed_nodes.append(f'({nr}, {nc})')  # Collect traversed node
+                    break
+                else:
+                    break  # Hit a wall 'YT#' or non-empty cell
+
+
+            # If we moved at least one step, connect to the last valid cell found
+            # but neglecting the starting one
+            # Note the periodic boundary conditions
+            last_valid_cell = ((nr - dr)% len(data), (nc - dc)% len(data[nr]))
+            #if (nr - dr, nc - dc) in valid_fields and (nr - dr, nc - dc) != (r, c):
+            # Collect the direction information and all traversed nodes
+            # Note that traversed_nodes[:-1] exclude the last node (destination)
+            if last_valid_cell != (r, c):
+                if (dr, dc) == (-1, 0):
+                  graph[str((r, c))].append((str(last_valid_cell), 'U', traversed_nodes[:-1]))
+                elif (dr, dc) == (1, 0):
+                  graph[str((r, c))].append((str(last_valid_cell), 'D', traversed_nodes[:-1]))
+                elif (dr, dc) == (0, -1):
+                  graph[str((r, c))].append((str(last_valid_cell), 'L', traversed_nodes[:-1]))
+                elif (dr, dc) == (0, 1):
+                  graph[str((r, c))].append((str(last_valid_cell), 'R', traversed_nodes[:-1]))
+
+    return graph
+
+# Function to find all wormholes in the grid
+def find_wormholes(data):
+    wormholes = []
+    for r in range(len(data)):
+        for c in range(len(data[r])):
+            if data[r][c] == 'O':
+                wormholes.append(str((r, c)))
+    return wormholes
+
+# Function to find the player location in the grid
+def find_player(data):
+    for r in range(len(data)):
+        for c in range(len(data[r])):
+            if data[r][c] == 'P':
+                return str((r, c))
+    return None
+
+# Function to find the exit in the grid
+def find_exit(data):
+    for r in range(len(data)):
+        for c in range(len(data[r])):
+            if data[r][c] == 'X':
+                return str((r, c))
+    return None
+
+# Function to find the eggs in the grid
+def find_eggs(data):
+    eggs = []
+    for r in range(len(data)):
+        for c in range(len(data[r])):
+            if data[r][c] == '$':
+                eggs.append(str((r, c)))
+    return eggs
+
+# Valid fields of a grid, the cells a move can start from (see create_graph_by_rays)
+VALID_FIELDS = ' $PO'
+
+# The special cells of a grid as '(r, c)' strings: player and exit (None if missing), eggs,
+# wormholes and valid fields, in row major order
+BoardCells = namedtuple('BoardCells', ['start', 'exit', 'eggs', 'wormholes', 'valid_fields'])
+
+# Function to scan one row of the grid into the cells found so far, for scan_board and the board files
+def scan_row(r, row, cells):
+    for c, cell in enumerate(row):
+        if cell == 'X':
+            if cells['exit'] is None:
+                cells['exit'] = str((r, c))
+            continue
+        if cell not in VALID_FIELDS:
+            continue
+        label = str((r, c))
+        cells['valid_fields'].append(label)
+        if cell == '$':
+            cells['eggs'].append(label)
+        elif cell == 'O':
+            cells['wormholes'].append(label)
+        elif cell == 'P' and cells['start'] is None:
+            cells['start'] = label
+
+# Function to find the player, the exit, the eggs, the wormholes and the valid fields in one pass
+# over the grid (the same cells as find_player, find_exit, find_eggs and find_wormholes)
+def scan_board(data):
+    cells = {'start': None, 'exit': None, 'eggs': [], 'wormholes': [], 'valid_fields': []}
+    for r, row in enumerate(data):
+        scan_row(r, row, cells)
+    return BoardCells(**cells)
+
+# Function to replace destination cells in the graph based on the provided mapping synchronously
+def replace_wormhole_destinations(graph, mapping):
+    # Create a new graph to hold the updated edges
+    new_graph = defaultdict(list)
+
+    # Iterate through each node in the original graph
+    for node, edges in graph.items():
+        for destination, direction, traversed_nodes in edges:
+            # Check if the destination is in the mapping
+            if destination in mapping:
+                # Replace the destination with the mapped value
+                new_destination = mapping[destination]
+                new_graph[node].append((new_destination, direction, traversed_nodes))
+            else:
+                new_graph[node].append((destination, direction, traversed_nodes))
+
+    # Replace the original graph with the new graph
+    return new_graph
+
+
+# The two conditions of the puzzle: only visit any edge once or only visit any node once,
+# and the relaxed rule of the walkers (see chilly/core.py): visit any edge at most k times
+EDGES_ONCE = 'edges'
+NODES_ONCE = 'nodes'
+EDGES_K_TIMES = 'edges_k'
+
+# Immutable payload of an edge: the cells slid over with the destination as last cell,
+# the eggs collected on the way (as index into eggs and as bitmask) and the direction letter
+EdgePayload = namedtuple('EdgePayload', ['cells', 'eggs', 'egg_mask', 'direction'])
+
+# Integer tables a compiled graph derives from its edges: the source node of every edge, the in
+# edges of every node (CSR) and the eggs of every edge as indices into eggs (CSR), kept in the
+# graph cache so a cached graph does not derive them again
+GraphTables = namedtuple('GraphTables', ['sources', 'in_offsets', 'in_edges', 'egg_offsets', 'egg_ids'])
+
+
+class CompiledGraph:
+    """Integer indexed, array backed form of the graph used by the walkers.
+
+    Every cell that shows up in the graph gets a dense id. Nodes (cells Chilly
+    can stop on) come first with ids 0 .. num_nodes-1, the cells that are only
+    slid over follow after them. The out edges of node n are the edge ids
+    offsets[n] .. offsets[n+1]-1 (CSR layout) and edge e leads to targets[e]
+    in direction directions[e], sliding over the cells
+    span_cells[span_offsets[e]:span_offsets[e+1]] on its way.
+    The '(r, c)' strings are only kept in labels for input and output.
+
+    For the walkers the visited state is a bytearray with one flag per slot:
+    per edge id under the edge once rule and per node id under the node once
+    rule (see new_visited). Taking edge e marks the slot blocked_by(rule)[e],
+    the edge itself or its destination, and edge e is a valid move while its
+    slot is free. Next to it the walkers keep a small mask of the free out
+    edges of every node (bit i for the edge offsets[n] + i, see free_masks),
+    taking or giving back a slot updates the masks of the nodes with an edge
+    blocked by it (see slot_masks) and set_bits[mask] lists the valid moves,
+    so a move is picked without a scan over the out edges. The in edges of
+    node n are in_edges[in_offsets[n]:in_offsets[n+1]] (CSR layout too).
+
+    payloads[e] is the EdgePayload of edge e, so a walker pushes and pops
+    the traversed cells and the collected eggs of a move with one lookup by
+    edge id (the egg coverage is kept as counters updated on push and pop).
+    The payloads are built from the integer arrays on their first use, the
+    eggs of edge e are egg_ids[egg_offsets[e]:egg_offsets[e+1]]. tables are
+    the GraphTables if already known (e.g. from the graph cache), else they
+    are derived from the edges.
+    """
+
+    def __init__(self, labels, num_nodes, offsets, targets, directions,
+                 span_offsets, span_cells, start, exit, eggs, tables=None):
+        self.labels = labels
+        self.index = {label: i for i, label in enumerate(labels)}
+        self.num_nodes = num_nodes
+        self.num_edges = len(targets)
+        self.offsets = offsets
+        self.targets = targets
+        self.directions = directions
+        self.span_offsets = span_offsets
+        self.span_cells = span_cells
+        self.start = start
+        self.exit = exit
+        self.eggs = eggs
+        if tables is None:
+            tables = self.derive_tables()
+        self.sources, self.in_offsets, self.in_edges, self.egg_offsets, self.egg_ids = tables
+
+        # Set bits of every free out edge mask in ascending order (the out degree is at most 4)
+        max_degree = max(map(operator.sub, offsets[1:], offsets[:-1]), default=0)
+        self.set_bits = [tuple(i for i in range(max_degree) if mask >> i & 1) for mask in range(1 << max_degree)]
+
+        self._payloads = None
+
+        # Shortest path tables by goal node, see distances_to
+        self.distance_tables = {}
+
+    # Pickle only the arrays the graph is built from, they may be views into a memory mapped file
+    def __reduce__(self):
+        tables = GraphTables(*(array('i', table) for table in self.tables()))
+        return (CompiledGraph, (self.labels, self.num_nodes, array('i', self.offsets), array('i', self.targets),
+                                self.directions, array('i', self.span_offsets), array('i', self.span_cells),
+                                self.start, self.exit, array('i', self.eggs), tables))
+
+    # The GraphTables of the graph
+    def tables(self):
+        return GraphTables(self.sources, self.in_offsets, self.in_edges, self.egg_offsets, self.egg_ids)
+
+    # Derive the GraphTables from the edges
+    def derive_tables(self):
+        num_nodes = self.num_nodes
+        offsets = self.offsets
+        targets = self.targets
+        sources = array('i', (n for n in range(num_nodes) for _ in range(offsets[n], offsets[n + 1])))
+
+        # In edges of every node (CSR layout), for the node once rule and the reverse searches
+        in_offsets = array('i', [0] * (num_nodes + 1))
+        for target in targets:
+            in_offsets[target + 1] += 1
+        for n in range(num_nodes):
+            in_offsets[n + 1] += in_offsets[n]
+        in_edges = array('i', [0] * len(targets))
+        position = array('i', in_offsets[:num_nodes])
+        for e, target in enumerate(targets):
+            in_edges[position[target]] = e
+            position[target] += 1
+
+        # Eggs of every edge (CSR layout), in the order they are slid over
+        egg_index = {cell: i for i, cell in enumerate(self.eggs)}
+        egg_offsets = array('i', [0])
+        egg_ids = array('i')
+        for e in range(self.num_edges):
+            egg_ids.extend(egg_index[cell] for cell in (*self.traversed(e), targets[e]) if cell in egg_index)
+            egg_offsets.append(len(egg_ids))
+        return GraphTables(sources, in_offsets, in_edges, egg_offsets, egg_ids)
+
+    # Payload of every edge, built on the first use
+    @property
+    def payloads(self):
+        if self._payloads is None:
+            payloads = []
+            for e in range(self.num_edges):
+                edge_eggs = tuple(self.egg_ids[self.egg_offsets[e]:self.egg_offsets[e + 1]])
+                egg_mask = 0
+                for egg in edge_eggs:
+                    egg_mask |= 1 << egg
+                payloads.append(EdgePayload((*self.traversed(e), self.targets[e]), edge_eggs, egg_mask,
+                                            self.directions[e]))
+            self._payloads = payloads
+        return self._payloads
+
+    def __repr__(self):
+        return (f"CompiledGraph(nodes={self.num_nodes}, edges={self.num_edges}, "
+                f"cells={len(self.labels)}, eggs={len(self.eggs)})")
+
+    # Range of edge ids leaving a node
+    def out_edges(self, node):
+        return range(self.offsets[node], self.offsets[node + 1])
+
+    # Visited slot of every edge under a rule: the edge itself (edge once)
+    # or its destination node (node once)
+    def blocked_by(self, rule):
+        if rule == EDGES_ONCE:
+            return array('i', range(self.num_edges))
+        if rule == NODES_ONCE:
+            return array('i', self.targets)
+        raise ValueError(f"Unknown rule {rule!r}, expected {EDGES_ONCE!r} or {NODES_ONCE!r}")
+
+    # Empty visited state under a rule, one flag per slot of blocked_by
+    def new_visited(self, rule):
+        if rule == EDGES_ONCE:
+            return bytearray(self.num_edges)
+        if rule == NODES_ONCE:
+            return bytearray(self.num_nodes)
+        raise ValueError(f"Unknown rule {rule!r}, expected {EDGES_ONCE!r} or {NODES_ONCE!r}")
+
+    # Free out edge masks of all nodes with nothing visited, bit i of the mask of node n
+    # stands for the out edge offsets[n] + i
+    def free_masks(self):
+        return [(1 << (self.offsets[n + 1] - self.offsets[n])) - 1 for n in range(self.num_nodes)]
+
+    # The out edges blocked by every slot of blocked_by as (node, bits of its free mask) pairs,
+    # the bits to clear when the slot is marked visited and to set again when it is freed
+    def slot_masks(self, rule):
+        blocked_by = self.blocked_by(rule)
+        masks = [{} for _ in range(len(self.new_visited(rule)))]
+        for e in range(self.num_edges):
+            source = self.sources[e]
+            node_masks = masks[blocked_by[e]]
+            node_masks[source] = node_masks.get(source, 0) | 1 << (e - self.offsets[source])
+        return [tuple(node_masks.items()) for node_masks in masks]
+
+    # Edge ids leaving a node whose slot is not visited
+    def valid_edges(self, node, visited, blocked_by):
+        return [e for e in range(self.offsets[node], self.offsets[node + 1]) if not visited[blocked_by[e]]]
+
+    # Cells slid over by an edge (destination excluded)
+    def traversed(self, edge):
+        return self.span_cells[self.span_offsets[edge]:self.span_offsets[edge + 1]]
+
+    # Node path and traversed cells of a path given by its edge ids
+    def nodes_of(self, edge_path):
+        return [self.start] + [self.targets[e] for e in edge_path]
+
+    def cells_of(self, edge_path):
+        cells = [self.start]
+        for e in edge_path:
+            cells.extend(self.payloads[e].cells)
+        return cells
+
+    # Translate between '(r, c)' strings and cell ids
+    def node_id(self, label):
+        return self.index[label]
+
+    def labels_of(self, cells):
+        return [self.labels[cell] for cell in cells]
+
+    # Direction string of a path given by its edge ids
+    def edge_directions(self, edge_path):
+        return ''.join(self.directions[e] for e in edge_path)
+
+    # Direction string of a node path (first matching edge, like the scripts used to do)
+    def path_directions(self, path):
+        solution_string = ""
+        for node_from, node_to in zip(path, path[1:]):
+            solution_string += next(self.directions[e] for e in self.out_edges(node_from)
+                                    if self.targets[e] == node_to)
+        return solution_string
+
+    # Number of steps from every node to a node on the full graph (reverse BFS over the in edges),
+    # -1 where the node cannot be reached. Computed once per goal node and kept in distance_tables.
+    def distances_to(self, node):
+        if node in self.distance_tables:
+            return self.distance_tables[node]
+        distances = array('i', [-1] * self.num_nodes)
+        distances[node] = 0
+        queue = deque([node])
+        while queue:
+            n = queue.popleft()
+            for e in self.in_edges[self.in_offsets[n]:self.in_offsets[n + 1]]:
+                source = self.sources[e]
+                if distances[source] < 0:
+                    distances[source] = distances[n] + 1
+                    queue.append(source)
+        self.distance_tables[node] = distances
+        return distances
+
+    # Adjacency in the same shape as the string graph, for printing only
+    def adjacency(self):
+        for node in range(self.num_nodes):
+            edges = [(self.labels[self.targets[e]], self.directions[e],
+                      self.labels_of(self.traversed(e))) for e in self.out_edges(node)]
+            if edges:
+                yield self.labels[node], edges
+
+
+# Function to compile the string keyed graph into the dense CompiledGraph
+def compile_graph(graph, start_node, end_node, egg_positions):
+    labels = []
+    index = {}
+
+    def cell_id(label):
+        if label not in index:
+            index[label] = len(labels)
+            labels.append(label)
+        return index[label]
+
+    # Number the nodes first: sources, then destinations (exit, wormholes), start and exit
+    for node in graph:
+        cell_id(node)
+    for node, edges in graph.items():
+        for destination, direction, traversed_nodes in edges:
+            cell_id(destination)
+    for node in (start_node, end_node):
+        if node is not None:
+            cell_id(node)
+    num_nodes = len(labels)
+
+    # Build the CSR arrays, the traversed cells get ids behind the nodes
+    offsets = array('i', [0] * (num_nodes + 1))
+    targets = array('i')
+    directions = []
+    span_offsets = array('i', [0])
+    span_cells = array('i')
+    for node in range(num_nodes):
+        for destination, direction, traversed_nodes in graph.get(labels[node], ()):
+            targets.append(index[destination])
+            directions.append(direction)
+            span_cells.extend(cell_id(item) for item in traversed_nodes)
+            span_offsets.append(len(span_cells))
+        offsets[node + 1] = len(targets)
+
+    eggs = array('i', (cell_id(item) for item in egg_positions))
+    start = index[start_node] if start_node is not None else -1
+    exit = index[end_node] if end_node is not None else -1
+    return CompiledGraph(labels, num_nodes, offsets, targets, ''.join(directions),
+                         span_offsets, span_cells, start, exit, eggs)
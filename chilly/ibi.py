@@ -0,0 +1,160 @@
+import math
+import random
+
+import numpy as np
+
+from .checkpoint import check_checkpoint, graph_arrays, load_checkpoint, restore_rng, rng_arrays, save_checkpoint
+from .core import Bias, Walker
+from .graph import EDGES_ONCE
+
+class IBIBias(Bias):
+    """Tabulated bias U(L) over the path length at inverse temperature invkT, for the Walker (see chilly/core.py).
+
+    A move is taken with the Metropolis probability exp(-dU*invkT) between
+    tmp_path_length (the length before the last taken move, or after the last
+    reverse) and the current length, the lengths after every move go to the
+    histogram counts. set_table installs a new U and clears the counts.
+
+    Only the growing moves uphill are ever rejected, so a path of length L is
+    sampled with roughly the weight exp(-(sum of the uphill steps of U*invkT
+    up to L)), the log_weights the bulk moves aim at. Roughly, as tmp_path_length
+    lags one move behind after a taken move.
+    """
+
+    def __init__(self, U, invkT=1.0):
+        self.invkT = invkT
+        self.tmp_path_length = 1
+        self.set_table(U)
+
+    def set_table(self, U):
+        # Plain Python tables for the loop: the bias and the acceptance exp(-dU*invkT) of growing by one
+        self.table = U.tolist()
+        self.grow_accept = [1.0] + np.exp(np.minimum(-np.diff(U)*self.invkT, 0.0)).tolist()
+        self.log_weights = np.concatenate(([0.0], np.cumsum(np.minimum(-np.diff(U)*self.invkT, 0.0)))).tolist()
+        self.counts = [0] * len(U)
+
+    def log_weight(self, length):
+        return self.log_weights[length]
+
+    # The bulk move counts like a move, the lengths go on from the current one
+    def after_bulk(self, walker):
+        self.tmp_path_length = walker.length
+        self.counts[walker.length] += 1
+
+    # Hooks of the move loop of the Walker (see chilly/core.py)
+    def forward_accept(self, walker, next_edge, valid_moves):
+        # try the new path
+        tmp_new_path_length = len(walker.edge_path)
+        tmp_path_length = self.tmp_path_length
+
+        # dE = (tmp_new_path_length - tmp_path_length) + (U[tmp_new_path_length] - U[tmp_path_length])  # biased MC
+        # dE is zero after a reverse move and the step U[L] - U[L-1] after a move, looked up in grow_accept
+        if tmp_new_path_length == tmp_path_length:
+            accept = 1.0
+        elif tmp_new_path_length == tmp_path_length + 1:
+            accept = self.grow_accept[tmp_new_path_length]
+        else:
+            accept = math.exp(min(-(self.table[tmp_new_path_length] - self.table[tmp_path_length])*self.invkT, 0.0))
+
+        if walker.rng.random() < accept:
+            self.tmp_path_length = tmp_new_path_length
+            self.counts[tmp_new_path_length] += 1
+            return True
+        self.counts[tmp_path_length] += 1
+        return False
+
+    def backward_accept(self, walker, last_edge, valid_moves):
+        self.tmp_path_length = len(walker.edge_path) - 1
+        self.counts[self.tmp_path_length] += 1
+        return True
+
+
+# Monte Carlo walk with Iterative Boltzmann Inversion on the compiled graph
+#
+# The brute force dynamics of brute_force_walk, but every move is accepted only
+# with the Metropolis probability of the bias U over the path length (the Walker
+# of chilly/core.py with an IBIBias). Every sweeps_per_check moves U is updated
+# from the histogram of the path lengths, U += alpha * log(hist / mean(hist)),
+# which flattens the histogram over the iterations. Solutions are yielded like in
+# brute_force_walk, rng, best, stop, max_moves and max_uses have the same meaning
+# (stop is checked every sweeps_per_check moves).
+#
+# checkpoint: file to write the full sampler state to (see chilly/checkpoint.py)
+#             every checkpoint_interval iterations, resume: continue bit for bit
+#             from that file if it exists (same graph, rule and parameters)
+# initial_U: warm start from a learned bias, e.g. load_bias of a checkpoint on
+#            another board of similar size (cut or padded with its last value)
+# telemetry: Telemetry (see chilly/telemetry.py) that gets the counters of every block
+#            like in brute_force_walk, with the moves rejected by the bias and the iteration
+# bulk_moves: bulk moves of chilly/bulk.py like in brute_force_walk
+# jit: the compiled move loop like in brute_force_walk
+def ibi_walk(graph, minimum_steps, rule=EDGES_ONCE, E_max=120, alpha=0.5, invkT=1.0,
+             sweeps_per_check=1000000, rng=random, best=None, stop=None, max_moves=None, verbose=True,
+             checkpoint=None, checkpoint_interval=1, resume=False, initial_U=None, telemetry=None, max_uses=2,
+             bulk_moves=None, jit=False):
+    walker = Walker(graph, rule, rng=rng, max_uses=max_uses, bulk_moves=bulk_moves, jit=jit)
+    iteration = 0
+
+    # Histogram and bias (U) over the path length, sized to the longest possible path
+    # so no length can fall off the end, at least E_max
+    size = max(E_max, walker.max_length + 2)
+    hist = np.zeros(size)
+
+    # Initial bias (U): zero
+    U = np.zeros(size)
+    if initial_U is not None:
+        initial_U = np.asarray(initial_U, dtype=float)[:size]
+        U = np.pad(initial_U, (0, size - len(initial_U)), mode='edge')
+    walker.bias = table = IBIBias(U, invkT)
+
+    moves = 0
+
+    # Continue from the last checkpoint: path, counters, histogram, bias and random stream
+    state = load_checkpoint(checkpoint) if checkpoint is not None and resume else None
+    if state is not None:
+        check_checkpoint(state, 'ibi', graph)
+        walker.reset(state['edge_path'].tolist())
+        table.tmp_path_length = int(state['tmp_path_length'])
+        iteration = int(state['iteration'])
+        moves = int(state['moves'])
+        hist = state['hist']
+        U = state['U']
+        restore_rng(rng, state)
+
+    while max_moves is None or moves < max_moves:
+        if stop is not None and stop.is_set():
+            return
+        if verbose:
+            print('iteration', iteration)
+
+        hist += 1e-8
+        U += alpha*np.log(hist/np.mean(hist))
+        if verbose:
+            print(hist)
+        iteration += 1
+        table.set_table(U)
+
+        sweeps = sweeps_per_check if max_moves is None else min(sweeps_per_check, max_moves - moves)
+        moves += sweeps
+
+        solutions = walker.run(sweeps, minimum_steps, best)
+        hist = np.array(table.counts, dtype=float)
+
+        if telemetry is not None:
+            telemetry.block('ibi', moves, walker.length, walker.max_depth, extra={'iteration': iteration},
+                            **walker.block_counts)
+
+        # Write the full sampler state at the end of the block
+        if checkpoint is not None and iteration % checkpoint_interval == 0:
+            save_checkpoint(checkpoint, **graph_arrays('ibi', graph), **rng_arrays(rng),
+                            edge_path=np.array(walker.edge_path, dtype=np.int32),
+                            tmp_path_length=table.tmp_path_length, iteration=iteration, moves=moves, hist=hist, U=U)
+
+        for path, all_traversed_nodes_path, edge_path in solutions:
+            # The shared best one may have grown since the solution was hit
+            if best is None or len(edge_path) > best.value:
+                yield path, all_traversed_nodes_path, edge_path
+
+        # data = np.array([[E, -U[E]] for E in range(size)])
+        # Save to text file
+        # np.savetxt("Chilly_Results_Puzzle3_IBI.txt", data, fmt="%-8d %-8f", header="LengthPath U(E)")
@@ -0,0 +1,218 @@
+import math
+
+import numpy as np
+
+from .core import Bias, Once
+from .ibi import IBIBias
+from .streams import BlockRandom
+from .umbrella import UmbrellaBias
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional, the Walker then runs its Python move loop
+    njit = None
+
+# Compiled move loop of the brute force, umbrella and IBI Walker (see chilly/core.py), needs Numba
+#
+# The move loop over flat integer arrays: the out edges of node n are
+# offsets[n] .. offsets[n+1]-1 leading to targets[e], taking edge e marks
+# block[e] as visited (the edge itself under the edge once rule, its target
+# node under the node once rule) and collects the eggs egg_ids[egg_offsets[e]:
+# egg_offsets[e+1]]. The random doubles come from a BlockRandom, handed over as
+# array with peek and used up with advance, and are spent exactly like in the
+# Python loop: one to decide between move and reverse, one for the choice of
+# the move and one for the acceptance of a biased move. So the compiled loop
+# makes the same moves and finds the same solutions as the Python one, which
+# stays the reference (python_moves is the same loop uncompiled, e.g. to check
+# it without Numba).
+# The bias over the path length of UmbrellaBias and IBIBias comes as its tables
+# (see bias_arrays): the forward moves are accepted with the Metropolis
+# probability between tmp_length and the length like in forward_accept, the
+# lengths go to length_counts. The other biases (Wang-Landau, the replicas,
+# exit guided) keep their Python hooks.
+# Only the Walker without a bias or with one of these two under the edge once or
+# node once rule, without dead prefix pruning and with a BlockRandom is compiled
+# (see supported).
+HAVE_NUMBA = njit is not None
+
+
+# Function to check if a walker can use the compiled move loop
+def supported(walker):
+    return (type(walker.bias) in (Bias, UmbrellaBias, IBIBias) and type(walker.constraint) is Once
+            and walker.oracle is None and isinstance(walker.rng, BlockRandom))
+
+
+# Function to get the bias of a walker as tables for the compiled move loop: (table, grow_accept, invkT,
+# draw_always, count_reverse), empty tables without a bias. draw_always: a random double for every
+# acceptance (IBI) or only below 1 (umbrella), count_reverse: the lengths after a reverse are counted too
+def bias_arrays(bias):
+    if type(bias) is Bias:
+        return np.zeros(0), np.zeros(0), 1.0, False, False
+    invkT, draw_always = (float(bias.invkT), True) if type(bias) is IBIBias else (1.0, False)
+    return (np.asarray(bias.table, dtype=np.float64), np.asarray(bias.grow_accept, dtype=np.float64), invkT,
+            draw_always, draw_always)
+
+
+# Function to flatten the graph for the compiled move loop under a rule
+def graph_arrays(graph, rule):
+    offsets = np.asarray(graph.offsets, dtype=np.int64)
+    targets = np.asarray(graph.targets, dtype=np.int64)
+    block = np.asarray(graph.blocked_by(rule), dtype=np.int64)
+    egg_offsets = np.zeros(graph.num_edges + 1, dtype=np.int64)
+    egg_offsets[1:] = np.cumsum([len(payload.eggs) for payload in graph.payloads])
+    egg_ids = np.array([egg for payload in graph.payloads for egg in payload.eggs], dtype=np.int64)
+    return offsets, targets, block, egg_offsets, egg_ids
+
+
+# The move loop, continues the walk of path[:length+1] / edge_path[:length] for up to moves moves
+# with the doubles uniforms[u:], returns (moves done, u, length, collected, tmp_length, found) and
+# stops early right after a solution (found: at the exit with all eggs, at least minimum_steps and
+# more than best_value steps).
+# counters (attempted, backtracks, dead_ends, exit_visits, max_depth, bias_rejections) and
+# length_counts are added to, the bias tables are those of bias_arrays (empty: no bias).
+def python_moves(offsets, targets, block, egg_offsets, egg_ids, visited, path, edge_path, length, egg_counts,
+                 collected, uniforms, u, moves, minimum_steps, best_value, end_node, num_eggs, counters,
+                 table, grow_accept, invkT, draw_always, count_reverse, tmp_length, length_counts):
+    biased = len(table) > 0
+    for i in range(moves):
+        current_node = path[length]
+
+        # Count the valid moves, out edges into an unvisited block
+        valid = 0
+        for e in range(offsets[current_node], offsets[current_node + 1]):
+            if not visited[block[e]]:
+                valid += 1
+
+        # Decide whether to move or reverse the last move
+        x = uniforms[u]
+        u += 1
+        if x > 1.0/(valid + 1):
+            # Randomly select a valid move, the k-th valid out edge
+            k = int(uniforms[u] * valid)
+            u += 1
+            next_edge = offsets[current_node]
+            while True:
+                if not visited[block[next_edge]]:
+                    if k == 0:
+                        break
+                    k -= 1
+                next_edge += 1
+
+            # Accept the move with the Metropolis probability of the bias (UmbrellaBias.forward_accept)
+            if biased:
+                if length == tmp_length:
+                    accept = 1.0
+                elif length == tmp_length + 1:
+                    accept = grow_accept[length]
+                else:
+                    accept = math.exp(min(-(table[length] - table[tmp_length])*invkT, 0.0))
+                if draw_always or accept < 1.0:
+                    x = uniforms[u]
+                    u += 1
+                    if not x < accept:
+                        length_counts[tmp_length] += 1
+                        counters[5] += 1
+                        continue
+                tmp_length = length
+                length_counts[length] += 1
+
+            visited[block[next_edge]] = True
+            for j in range(egg_offsets[next_edge], egg_offsets[next_edge + 1]):
+                if egg_counts[egg_ids[j]] == 0:
+                    collected += 1
+                egg_counts[egg_ids[j]] += 1
+            edge_path[length] = next_edge
+            length += 1
+            path[length] = targets[next_edge]
+            if length > counters[4]:
+                counters[4] = length
+
+            # Check for end-condition
+            if path[length] == end_node:
+                counters[3] += 1
+                if length >= minimum_steps and collected == num_eggs and length > best_value:
+                    counters[0] += i + 1
+                    return i + 1, u, length, collected, tmp_length, True
+        else:
+            if valid == 0:
+                counters[2] += 1
+
+            # Reverse the last move if there is one
+            if length > 0:
+                counters[1] += 1
+                length -= 1
+                if biased:
+                    tmp_length = length
+                    if count_reverse:
+                        length_counts[length] += 1
+                last_edge = edge_path[length]
+                visited[block[last_edge]] = False
+                for j in range(egg_offsets[last_edge], egg_offsets[last_edge + 1]):
+                    egg_counts[egg_ids[j]] -= 1
+                    if egg_counts[egg_ids[j]] == 0:
+                        collected -= 1
+    counters[0] += moves
+    return moves, u, length, collected, tmp_length, False
+
+
+run_moves = njit(cache=True)(python_moves) if HAVE_NUMBA else python_moves
+
+
+# Function to perform a number of moves of a walker with the compiled move loop, like Walker.run
+# (the state of the walker, its counters and the random stream end up exactly as with the Python loop)
+def run(walker, moves, minimum_steps, best=None, move_loop=run_moves):
+    graph = walker.graph
+    if walker.jit_arrays is None:
+        walker.jit_arrays = graph_arrays(graph, walker.rule)
+    offsets, targets, block, egg_offsets, egg_ids = walker.jit_arrays
+
+    # Walker state as arrays
+    start_length = length = walker.length
+    visited = np.zeros(len(walker.visited), dtype=np.bool_)
+    visited[block[walker.edge_path]] = True
+    path = np.empty(walker.max_length + 1, dtype=np.int64)
+    path[:length + 1] = walker.path
+    edge_path = np.empty(walker.max_length, dtype=np.int64)
+    edge_path[:length] = walker.edge_path
+    egg_counts = np.array(walker.egg_counts, dtype=np.int64)
+    collected = walker.collected_eggs
+    counters = np.zeros(6, dtype=np.int64)
+
+    # The bias as tables and its state
+    bias = walker.bias
+    table, grow_accept, invkT, draw_always, count_reverse = bias_arrays(bias)
+    tmp_length = getattr(bias, 'tmp_path_length', 0)
+    length_counts = np.zeros(len(table), dtype=np.int64)
+
+    # At most three doubles per move
+    uniforms = walker.rng.peek(3 * moves)
+    u = 0
+    solutions = []
+    hits = []
+    while moves > 0:
+        best_value = -1 if best is None else best.value
+        done, u, length, collected, tmp_length, found = move_loop(
+            offsets, targets, block, egg_offsets, egg_ids, visited, path, edge_path, length, egg_counts, collected,
+            uniforms, u, moves, minimum_steps, best_value, graph.exit, len(graph.eggs), counters,
+            table, grow_accept, invkT, draw_always, count_reverse, tmp_length, length_counts)
+        moves -= done
+        walker.moves += done
+        if found:
+            edges = edge_path[:length].tolist()
+            solutions.append((path[:length + 1].tolist(), graph.cells_of(edges), edges))
+            hits.append(walker.moves)
+    walker.rng.advance(u)
+
+    # Back to the walker
+    walker.reset(edge_path[:length].tolist())
+    if type(bias) is not Bias:
+        bias.tmp_path_length = tmp_length
+        for L in np.flatnonzero(length_counts).tolist():
+            bias.counts[L] += int(length_counts[L])
+    attempted, backtracks, dead_ends, exit_visits, max_depth, bias_rejections = counters.tolist()
+    walker.max_depth = max_depth
+    walker.hits = hits
+    walker.block_counts = {'attempted': attempted, 'accepted': backtracks + length - start_length,
+                           'backtracks': backtracks, 'dead_ends': dead_ends, 'pruned': 0,
+                           'bias_rejections': bias_rejections, 'exit_visits': exit_visits}
+    return solutions
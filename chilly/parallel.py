@@ -0,0 +1,129 @@
+import multiprocessing
+import os
+import queue
+import random
+import time
+from collections import namedtuple
+
+from .brute_force import brute_force_walk
+from .exit_guided import exit_guided_walk
+from .perm import perm_walk
+from .wang_landau import wang_landau_walk
+
+# A solution reported by a worker: index and seed of the worker (the master seed with the
+# 'pcg64' generator, the worker index picks the stream), the edge ids of the path
+# and the number of solutions the worker had reported before (its position in the worker's stream)
+ParallelSolution = namedtuple('ParallelSolution', ['worker', 'seed', 'edges', 'index'])
+
+
+# Walk function of a sampler name, umbrella and IBI need NumPy and are looked up only on request
+def get_walker(sampler):
+    if sampler == 'brute_force':
+        return brute_force_walk
+    if sampler == 'umbrella':
+        from .umbrella import umbrella_walk
+        return umbrella_walk
+    if sampler == 'ibi':
+        from .ibi import ibi_walk
+        return ibi_walk
+    if sampler == 'wang_landau':
+        return wang_landau_walk
+    if sampler == 'exit_guided':
+        return exit_guided_walk
+    if sampler == 'perm':
+        return perm_walk
+    raise ValueError(f"Unknown sampler {sampler!r}, expected 'brute_force', 'umbrella', 'ibi', "
+                     f"'wang_landau', 'exit_guided' or 'perm'")
+
+
+# Seeds of the workers, derived from the master seed only
+def worker_seeds(master_seed, workers):
+    master = random.Random(master_seed)
+    return [master.getrandbits(64) for _ in range(workers)]
+
+
+# Body of one worker process: walk with its own seeded random stream and report every
+# solution that beats the best length published in shared memory
+def _search_worker(worker, seed, graph, sampler, minimum_steps, target_steps, max_moves,
+                   options, best, stop, results, generator):
+    walk = get_walker(sampler)
+    if generator == 'pcg64':
+        from .streams import worker_stream
+        rng = worker_stream(seed, worker)
+    else:
+        rng = random.Random(seed)
+    index = 0
+    for path, all_traversed_nodes_path, edge_path in walk(graph, minimum_steps, rng=rng, best=best,
+                                                          stop=stop, max_moves=max_moves, **options):
+        # Publish the new best length, the other workers raise their threshold with it
+        with best.get_lock():
+            if len(edge_path) <= best.value:
+                continue
+            best.value = len(edge_path)
+        results.put(ParallelSolution(worker, seed, edge_path, index))
+        index += 1
+        if target_steps is not None and len(edge_path) >= target_steps:
+            stop.set()
+            break
+    results.put(None)  # Worker is done
+
+
+# Run one independently seeded walker per core and keep the longest solution
+#
+# sampler: 'brute_force', 'umbrella', 'ibi', 'wang_landau' or 'exit_guided', options are passed on to the walk function
+# target_steps: all workers stop as soon as a solution of that length is found
+# time_budget: all workers stop after that many seconds
+# max_moves: every worker stops after that many attempted moves
+# generator: 'random' (random.Random of the worker seeds) or 'pcg64' (jumped NumPy PCG64
+#            streams of the master seed, see chilly/streams.py)
+#
+# The walk of every worker only depends on its seed (see worker_seeds) or stream, the shared
+# best length only decides which of its solutions get reported. Returns the list of
+# reported solutions, longest last.
+def parallel_search(graph, sampler='brute_force', minimum_steps=0, workers=None, master_seed=0,
+                    target_steps=None, time_budget=None, max_moves=None, generator='random', **options):
+    if target_steps is None and time_budget is None and max_moves is None:
+        raise ValueError("parallel_search needs a target_steps, time_budget or max_moves to stop")
+    if generator not in ('random', 'pcg64'):
+        raise ValueError(f"Unknown generator {generator!r}, expected 'random' or 'pcg64'")
+    workers = workers or os.cpu_count() or 1
+    if sampler != 'brute_force':
+        options.setdefault('verbose', False)  # No histogram dumps from every worker
+
+    context = multiprocessing.get_context()
+    best = context.Value('i', minimum_steps - 1)
+    stop = context.Event()
+    results = context.Queue()
+
+    processes = [context.Process(target=_search_worker,
+                                 args=(worker, seed, graph, sampler, minimum_steps, target_steps,
+                                       max_moves, options, best, stop, results, generator),
+                                 daemon=True)
+                 for worker, seed in enumerate(worker_seeds(master_seed, workers) if generator == 'random'
+                                               else [master_seed] * workers)]
+    for process in processes:
+        process.start()
+
+    # Collect the reports until every worker is done or the time budget is used up
+    solutions = []
+    running = len(processes)
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    while running:
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+        try:
+            report = results.get(timeout=timeout)
+        except queue.Empty:  # Time budget used up
+            stop.set()
+            deadline = None
+            continue
+        if report is None:
+            running -= 1
+        else:
+            solutions.append(report)
+
+    for process in processes:
+        process.join()
+
+    # Longest last, on equal length the lowest worker comes last
+    solutions.sort(key=lambda solution: (len(solution.edges), -solution.worker))
+    return solutions
@@ -0,0 +1,245 @@
+import math
+import random
+
+from .graph import EDGES_ONCE, NODES_ONCE
+from .reachability import can_finish
+
+
+class PERM:
+    """Pruned-enriched Rosenbluth method (PERM) over the paths from the start.
+
+    A tour grows a population of partial paths (chains) one edge per
+    generation, every chain by a uniform choice among its n valid edges, which
+    multiplies its Rosenbluth weight W by n. Chains without a valid edge (or
+    with a dead prefix, prune_dead) die. After every generation each chain is
+    compared with the population: with r = W * population / (sum of W) a chain
+    with r > clone_threshold is cloned into min(int(r), max_clones) copies that
+    share the weight, a chain with r < prune_threshold survives with probability
+    1/2 and twice the weight. Both keep the expected weight, so the sum of W
+    over the chains of length L divided by population estimates the number of
+    paths of L steps from the start under the rule (see path_counts), and the
+    population stays around its target size. A tour ends once all chains died.
+
+    The chains keep their edges as a linked list (edge, rest) that the clones
+    share, so a clone costs no copy of its path, and their visited slots (see
+    CompiledGraph.blocked_by) as a frozenset, so a chain costs memory in its
+    length and not in the size of the graph. histogram counts the chains
+    that reached every length, solutions keeps the keep longest full solutions
+    (at the exit with all eggs) as edge paths, longest first. The rule is
+    EDGES_ONCE or NODES_ONCE, the chains keep no use counts for EDGES_K_TIMES.
+    """
+
+    def __init__(self, graph, rule=EDGES_ONCE, population=1000, clone_threshold=2.0, prune_threshold=0.5,
+                 max_clones=10, rng=random, prune_dead=False, keep=10):
+        if rule not in (EDGES_ONCE, NODES_ONCE):
+            raise ValueError(f"PERM grows paths under the rule {EDGES_ONCE!r} or {NODES_ONCE!r}, not {rule!r}")
+        self.graph = graph
+        self.rule = rule
+        self.blocked_by = graph.blocked_by(rule)
+        self.population = population
+        self.clone_threshold = clone_threshold
+        self.prune_threshold = prune_threshold
+        self.max_clones = max_clones
+        self.rng = rng
+        self.prune_dead = prune_dead
+        self.scratch = graph.new_visited(rule)  # The slots of one chain for can_finish
+        self.keep = keep
+
+        # Every edge is taken at most once, so no chain is longer than the number of edges
+        self.histogram = [0] * (graph.num_edges + 1)
+        self.ln_weight_sums = [-math.inf] * (graph.num_edges + 1)  # ln of the sum of W / population over the tours
+        self.tours = 0
+        self.solutions = []
+
+        # ln(n) for n valid moves, the factors of the Rosenbluth weight
+        max_degree = max((graph.offsets[n + 1] - graph.offsets[n] for n in range(graph.num_nodes)), default=0)
+        self.log_choices = [0.0] + [math.log(n) for n in range(1, max_degree + 1)]
+
+        self.chains = []
+        self.length = 0
+        self.max_length = 0  # Longest chain so far
+
+        # Counters of the last generation, for the telemetry
+        self.block_counts = {}
+
+    # Start a new tour with population chains on the empty path: (node, visited slots, missing eggs, ln W, edges)
+    def start_tour(self):
+        self.chains = [(self.graph.start, frozenset(), (1 << len(self.graph.eggs)) - 1, 0.0, None)] * self.population
+        self.tour_sums = [0.0]
+        self.length = 0
+        self.histogram[0] += self.population
+
+    # Grow every chain by one edge, then clone and prune, returns the edge paths of the new full solutions
+    # that are at least minimum_steps long
+    def step(self, minimum_steps=0):
+        if not self.chains:
+            self.start_tour()
+        graph = self.graph
+        offsets = graph.offsets
+        targets = graph.targets
+        payloads = graph.payloads
+        blocked_by = self.blocked_by
+        log_choices = self.log_choices
+        prune_dead = self.prune_dead
+        scratch = self.scratch
+        choice = self.rng.choice
+        attempted = len(self.chains)
+        dead_ends = pruned = 0
+
+        # Grow every chain by one uniformly chosen valid edge
+        grown = []
+        for node, visited, missing, ln_weight, edges in self.chains:
+            valid_moves = [e for e in range(offsets[node], offsets[node + 1]) if blocked_by[e] not in visited]
+            if not valid_moves:
+                dead_ends += 1
+                continue
+            next_edge = choice(valid_moves)
+            next_node = targets[next_edge]
+            next_visited = visited | {blocked_by[next_edge]}
+            next_missing = missing & ~payloads[next_edge].egg_mask
+            if prune_dead:
+                for slot in next_visited:
+                    scratch[slot] = 1
+                alive = can_finish(self.graph, blocked_by, next_node, scratch, next_missing)
+                for slot in next_visited:
+                    scratch[slot] = 0
+                if not alive:
+                    pruned += 1
+                    continue
+            grown.append((next_node, next_visited, next_missing, ln_weight + log_choices[len(valid_moves)],
+                          (next_edge, edges)))
+        self.length += 1
+        length = self.length
+
+        solutions = []
+        if grown:
+            self.histogram[length] += len(grown)
+            self.max_length = max(self.max_length, length)
+
+            # Sum of the weights, shifted by the largest one against overflow
+            ln_max = max(chain[3] for chain in grown)
+            ln_sum = ln_max + math.log(sum(math.exp(chain[3] - ln_max) for chain in grown))
+            self.tour_sums.append(ln_sum - math.log(self.population))
+
+            # Full solutions, the clones of a chain share its edges and are reported once
+            if length >= minimum_steps:
+                seen = set()
+                for node, visited, missing, ln_weight, edges in grown:
+                    if node == graph.exit and not missing and id(edges) not in seen:
+                        seen.add(id(edges))
+                        solutions.append(self.edges_of(edges))
+                self.add_solutions(solutions)
+
+        # Clone the heavy chains and prune the light ones, relative to the population
+        chains = []
+        cloned = killed = 0
+        random_float = self.rng.random
+        ln_scale = math.log(self.population) - ln_sum if grown else 0.0
+        for chain in grown:
+            r = math.exp(chain[3] + ln_scale)
+            if r > self.clone_threshold:
+                copies = min(int(r), self.max_clones)
+                ln_weight = chain[3] - math.log(copies)
+                chains.extend([chain[:3] + (ln_weight, chain[4])] * copies)
+                cloned += copies - 1
+            elif r < self.prune_threshold:
+                if random_float() < 0.5:
+                    chains.append(chain[:3] + (chain[3] + math.log(2.0), chain[4]))
+                else:
+                    killed += 1
+            else:
+                chains.append(chain)
+        self.chains = chains
+        if not chains:
+            self.end_tour()
+
+        self.block_counts = {'attempted': attempted, 'accepted': len(grown), 'dead_ends': dead_ends,
+                             'pruned': pruned, 'cloned': cloned, 'killed': killed}
+        return solutions
+
+    # Add the weight sums of the finished tour to the estimate
+    def end_tour(self):
+        self.tours += 1
+        for length, ln_sum in enumerate(self.tour_sums):
+            self.ln_weight_sums[length] = _log_add(self.ln_weight_sums[length], ln_sum)
+
+    # Edge path of the linked edges of a chain
+    @staticmethod
+    def edges_of(edges):
+        edge_path = []
+        while edges is not None:
+            edge, edges = edges
+            edge_path.append(edge)
+        edge_path.reverse()
+        return edge_path
+
+    # Keep the longest distinct solutions, longest first
+    def add_solutions(self, solutions):
+        for edge_path in solutions:
+            if edge_path not in self.solutions:
+                self.solutions.append(edge_path)
+        self.solutions.sort(key=len, reverse=True)
+        del self.solutions[self.keep:]
+
+    # Estimated ln of the number of paths of every length reached so far, over the finished tours
+    def ln_path_counts(self):
+        if not self.tours:
+            return []
+        return [value - math.log(self.tours) for value in self.ln_weight_sums[:self.max_length + 1]]
+
+    # Estimated number of paths of every length reached so far (0 for a length no finished tour reached)
+    def path_counts(self):
+        return [math.exp(value) for value in self.ln_path_counts()]
+
+
+# Function to add two numbers given by their logs, ln(exp(a) + exp(b))
+def _log_add(a, b):
+    if a < b:
+        a, b = b, a
+    if b == -math.inf:
+        return a
+    return a + math.log1p(math.exp(b - a))
+
+
+# Monte Carlo chain growth with PERM on the compiled graph
+#
+# Unlike the walks that grow and reverse one path, PERM grows a population of
+# paths at once and multiplies the ones that keep finding room while dropping
+# the ones that run into dead ends (see PERM), which reaches the rare long paths
+# without backtracking over them. Tour after tour, the chains at the exit with
+# all eggs and at least minimum_steps steps are yielded like in brute_force_walk
+# after every generation. The sampler is passed in to read the histogram, the
+# path counts and the best solutions while or after walking, otherwise a new one
+# is created from the options. rng, best, stop and prune_dead have the same meaning
+# as in brute_force_walk, max_moves counts the grown chains (checked after every
+# generation). The rule is EDGES_ONCE or NODES_ONCE. Every worker of
+# parallel_search grows its own tours, so the prefixes spread over the workers.
+# The longest chain and solution are printed after every tour if verbose is set.
+# telemetry: Telemetry (see chilly/telemetry.py) that gets the counters of every
+#            generation: grown chains (attempted, accepted), dead ends, pruned,
+#            cloned and killed chains, with the tour
+def perm_walk(graph, minimum_steps, rule=EDGES_ONCE, population=1000, clone_threshold=2.0, prune_threshold=0.5,
+              max_clones=10, rng=random, best=None, stop=None, max_moves=None, prune_dead=False, keep=10,
+              verbose=True, sampler=None, telemetry=None):
+    if sampler is None:
+        sampler = PERM(graph, rule, population, clone_threshold, prune_threshold, max_clones, rng, prune_dead, keep)
+
+    moves = 0
+    while max_moves is None or moves < max_moves:
+        if stop is not None and stop.is_set():
+            return
+        tours = sampler.tours
+        solutions = sampler.step(minimum_steps)
+        moves += sampler.block_counts['attempted']
+        if sampler.tours > tours and verbose:
+            print('tour', sampler.tours, 'longest chain', sampler.max_length,
+                  'longest solution', len(sampler.solutions[0]) if sampler.solutions else None)
+
+        if telemetry is not None:
+            telemetry.block('perm', moves, sampler.length, sampler.max_length, extra={'tour': sampler.tours},
+                            **sampler.block_counts)
+
+        for edge_path in solutions:
+            # Check if the path beats the shared best one
+            if best is None or len(edge_path) > best.value:
+                yield graph.nodes_of(edge_path), graph.cells_of(edge_path), edge_path
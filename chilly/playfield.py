@@ -0,0 +1,50 @@
+import random
+
+OBSTACLES = 'TY#'
+
+
+# Function to create a random periodic playfield in the format of the puzzle scripts
+#
+# rows x cols cells, every cell is an obstacle ('T', 'Y' or '#') with probability
+# obstacle_density, then the player 'P', the exit 'X', the eggs '$' and the
+# wormholes 'O' are put on distinct empty cells. The moves wrap around, so every
+# row and every column gets at least one obstacle (or exit or wormhole), otherwise
+# a slide would never stop. The wormholes are linked in a cycle like in Puzzle1.
+# Returns the grid as list of strings and the wormhole mapping.
+def random_playfield(rows, cols, obstacle_density=0.2, eggs=4, wormholes=0, rng=random):
+    grid = [[rng.choice(OBSTACLES) if rng.random() < obstacle_density else ' ' for c in range(cols)]
+            for r in range(rows)]
+
+    # Put the player, the exit, the eggs and the wormholes on empty cells
+    empty = [(r, c) for r in range(rows) for c in range(cols) if grid[r][c] == ' ']
+    if len(empty) < 2 + eggs + wormholes:
+        raise ValueError(f"A {rows}x{cols} playfield has too few empty cells for {eggs} eggs and {wormholes} wormholes")
+    special = rng.sample(empty, 2 + eggs + wormholes)
+    for (r, c), item in zip(special, ['P', 'X'] + ['$'] * eggs + ['O'] * wormholes):
+        grid[r][c] = item
+    special = set(special)
+
+    # Stop every wrapping slide: one stopping cell per row and per column
+    stoppers = OBSTACLES + 'XO'
+    for r in range(rows):
+        if not any(cell in stoppers for cell in grid[r]):
+            free = [c for c in range(cols) if (r, c) not in special]
+            if not free:
+                raise ValueError(f"Row {r} of a {rows}x{cols} playfield has no room for an obstacle")
+            grid[r][rng.choice(free)] = rng.choice(OBSTACLES)
+    for c in range(cols):
+        if not any(grid[r][c] in stoppers for r in range(rows)):
+            free = [r for r in range(rows) if (r, c) not in special]
+            if not free:
+                raise ValueError(f"Column {c} of a {rows}x{cols} playfield has no room for an obstacle")
+            grid[rng.choice(free)][c] = rng.choice(OBSTACLES)
+
+    data = [''.join(row) for row in grid]
+
+    # Link the wormholes in a cycle
+    holes = [str((r, c)) for r in range(rows) for c in range(cols) if grid[r][c] == 'O']
+    wormhole_mapping = {}
+    if len(holes) > 1:
+        for hole, destination in zip(holes, holes[1:] + holes[:1]):
+            wormhole_mapping[hole] = destination
+    return data, wormhole_mapping
@@ -0,0 +1,98 @@
+import random
+
+from .graph import EDGES_ONCE
+
+
+# Function to check whether a state (current node, visited slots, missing eggs) can still end in a
+# solution, with one flood fill over the edges with an unvisited slot (see CompiledGraph.blocked_by)
+#
+# It can if it is a solution itself (at the exit with no egg missing) or if the exit and an edge
+# carrying every missing egg can still be reached from the node. The flood fill stops as soon as
+# that is settled. For states without a walker to keep a ReachabilityOracle up to date (e.g. the
+# chains of PERM).
+def can_finish(graph, blocked_by, node, visited, missing):
+    offsets = graph.offsets
+    targets = graph.targets
+    payloads = graph.payloads
+    end_node = graph.exit
+    if node == end_node and not missing:
+        return True
+
+    exit_found = False
+    seen = {node}
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        for e in range(offsets[n], offsets[n + 1]):
+            if visited[blocked_by[e]]:
+                continue
+            missing &= ~payloads[e].egg_mask
+            target = targets[e]
+            if target == end_node:
+                exit_found = True
+            if exit_found and not missing:
+                return True
+            if target not in seen:
+                seen.add(target)
+                stack.append(target)
+    return False
+
+
+class ReachabilityOracle:
+    """Tells whether a prefix of a walk can still end in a solution, with the answers cached.
+
+    A state (current node, visited slots, missing eggs) is alive under the same
+    condition as in can_finish, which answers a state the first time. visited is
+    the bytearray of slots of the walker (see CompiledGraph.new_visited for the
+    rule), shared with the oracle. The walker calls block(slot) and unblock(slot)
+    whenever it marks a slot as visited or frees it, which keeps a Zobrist key of
+    the visited slots up to date: the xor of a random 128 bit number per visited
+    slot, so a cached state takes about a hundred bytes whatever the size
+    of the graph (two sets of slots share a key with a chance of about 2^-128).
+    The cache is cleared once it would hold more than cache_bytes.
+    """
+
+    # Rough size of one cache entry: the key (an int of about 160 bits), the answer and the dict slot
+    entry_bytes = 120
+
+    def __init__(self, graph, rule=EDGES_ONCE, visited=None, cache_bytes=64 << 20, seed=0):
+        self.graph = graph
+        self.rule = rule
+        self.blocked_by = graph.blocked_by(rule)
+        self.visited = visited if visited is not None else graph.new_visited(rule)
+
+        # Zobrist numbers of the slots and the key of the visited ones
+        zobrist = random.Random(seed)
+        self.zobrist = [zobrist.getrandbits(128) for _ in range(len(self.visited))]
+        self.key = 0
+        for slot, flag in enumerate(self.visited):
+            if flag:
+                self.key ^= self.zobrist[slot]
+
+        # The node and the missing eggs go into the low bits of the cache key
+        self.node_bits = graph.num_nodes.bit_length()
+        self.state_bits = self.node_bits + len(graph.eggs)
+        self.max_entries = max(cache_bytes // self.entry_bytes, 1)
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    # A slot was marked as visited or freed
+    def block(self, slot):
+        self.key ^= self.zobrist[slot]
+
+    unblock = block
+
+    # Check a state of the walker, node the current node and missing the bitmask of the eggs not collected yet
+    def alive(self, node, missing):
+        key = self.key << self.state_bits | missing << self.node_bits | node
+        result = self.cache.get(key)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = can_finish(self.graph, self.blocked_by, node, self.visited, missing)
+        if len(self.cache) >= self.max_entries:
+            self.cache.clear()
+        self.cache[key] = result
+        return result
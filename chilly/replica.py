@@ -0,0 +1,131 @@
+import math
+import random
+from collections import Counter
+
+from .core import Bias, Walker
+from .graph import EDGES_ONCE
+
+
+# Bias tables W(L) = invkT * E(L) over the path length L = 0 .. max_length + 1
+#
+# tempering_biases: E(L) = -L, every replica has its own inverse temperature,
+#                   invkT = 0 is the brute force walk, large invkT pushes to long paths
+# umbrella_biases:  E(L) = 0.5 * k * (L - L0)**2, every replica has its own window center L0
+def tempering_biases(max_length, invkTs):
+    return [[-invkT * L for L in range(max_length + 2)] for invkT in invkTs]
+
+def umbrella_biases(max_length, L0s, k=0.005, invkT=1.0):
+    return [[invkT * 0.5 * k * (L - L0)**2 for L in range(max_length + 2)] for L0 in L0s]
+
+
+class Replica(Bias):
+    """One walker of the replica exchange with its own bias table W(L).
+
+    It is the bias of its Walker (see chilly/core.py), which makes the grow and
+    reverse moves of brute_force_walk, both are accepted with the Metropolis
+    probability min(1, exp(-(W(L') - W(L)))), so every replica samples the walk
+    with the weight exp(-W(L)) and two replicas can exchange their configurations.
+    prune_dead rejects the moves into dead prefixes like in brute_force_walk.
+    """
+
+    def __init__(self, graph, bias, rule=EDGES_ONCE, rng=random, prune_dead=False):
+        self.graph = graph
+        self.rng = rng
+        self.set_bias(bias)
+        self.walker = Walker(graph, rule, self, rng, prune_dead)
+
+    # Install a bias table and precompute the acceptance of growing and reversing at every length
+    def set_bias(self, bias):
+        self.bias = bias
+        self.grow_accept = [math.exp(min(bias[L] - bias[L + 1], 0.0)) for L in range(len(bias) - 1)]
+        self.reverse_accept = [1.0] + [math.exp(min(bias[L] - bias[L - 1], 0.0)) for L in range(1, len(bias))]
+
+    # Hooks of the move loop of the Walker
+    def forward_accept(self, walker, next_edge, valid_moves):
+        accept = self.grow_accept[len(walker.edge_path)]
+        return accept >= 1.0 or walker.rng.random() < accept
+
+    def backward_accept(self, walker, last_edge, valid_moves):
+        accept = self.reverse_accept[len(walker.edge_path)]
+        return accept >= 1.0 or walker.rng.random() < accept
+
+    def log_weight(self, length):
+        return -self.bias[length]
+
+    @property
+    def length(self):
+        return self.walker.length
+
+    # Perform a number of moves, return the edge paths of all solutions hit on the way
+    def run(self, moves, minimum_steps):
+        solutions = self.walker.run(moves, minimum_steps)
+        return [edge_path for path, all_traversed_nodes_path, edge_path in solutions]
+
+
+class ReplicaExchange:
+    """Replica exchange (parallel tempering) over the path length.
+
+    Every replica walks with its own bias table (see tempering_biases and
+    umbrella_biases). After swap_interval moves of every replica, neighbouring
+    replicas i, i+1 (even and odd pairs in turn) try to exchange their
+    configurations with probability
+    min(1, exp(-(W_i(L_j) + W_j(L_i) - W_i(L_i) - W_j(L_j)))).
+    The exchange swaps the bias tables of the two walkers, replicas[i] is
+    always the walker currently holding bias i. prune_dead is passed on to the
+    replicas, telemetry (see chilly/telemetry.py) gets the counters of the moves of
+    all replicas and the swaps of every cycle.
+    """
+
+    def __init__(self, graph, biases, minimum_steps=0, rule=EDGES_ONCE, rng=random, prune_dead=False,
+                 telemetry=None):
+        self.graph = graph
+        self.minimum_steps = minimum_steps
+        self.rng = rng
+        self.telemetry = telemetry
+        self.replicas = [Replica(graph, bias, rule, rng, prune_dead) for bias in biases]
+        self.swap_attempts = [0] * (len(biases) - 1)
+        self.swap_accepts = [0] * (len(biases) - 1)
+        self.cycles = 0
+        self.best = None  # Longest solution found so far (edge ids)
+
+    # Try to exchange the configurations of the replicas holding bias i and i+1
+    def attempt_swap(self, i):
+        first, second = self.replicas[i], self.replicas[i + 1]
+        L1, L2 = first.length, second.length
+        dW = first.bias[L2] + second.bias[L1] - first.bias[L1] - second.bias[L2]
+        self.swap_attempts[i] += 1
+        if dW <= 0 or self.rng.random() < math.exp(-dW):
+            self.swap_accepts[i] += 1
+            bias = first.bias
+            first.set_bias(second.bias)
+            second.set_bias(bias)
+            self.replicas[i], self.replicas[i + 1] = second, first
+            return True
+        return False
+
+    # Run a number of cycles of swap_interval moves per replica followed by the swap attempts,
+    # return the improvements of the best solution found in these cycles
+    def run(self, cycles, swap_interval=1000):
+        improvements = []
+        for _ in range(cycles):
+            counts = Counter()
+            for replica in self.replicas:
+                for edge_path in replica.run(swap_interval, self.minimum_steps):
+                    if self.best is None or len(edge_path) > len(self.best):
+                        self.best = edge_path
+                        improvements.append(edge_path)
+                counts.update(replica.walker.block_counts)
+            swaps = sum(self.attempt_swap(i) for i in range(self.cycles % 2, len(self.replicas) - 1, 2))
+            self.cycles += 1
+
+            if self.telemetry is not None:
+                self.telemetry.block('replica_exchange', self.cycles * swap_interval * len(self.replicas),
+                                     max(replica.length for replica in self.replicas),
+                                     max(replica.walker.max_depth for replica in self.replicas),
+                                     extra={'cycle': self.cycles}, swaps=swaps, **counts)
+        return improvements
+
+    # Fraction of accepted exchanges between the neighbouring biases i, i+1
+    def acceptance_rates(self):
+        return [accepts / attempts if attempts else 0.0
+                for accepts, attempts in zip(self.swap_accepts, self.swap_attempts)]
@@ -0,0 +1,146 @@
+import inspect
+import random
+import time
+
+from .graph import EDGES_K_TIMES, EDGES_ONCE, NODES_ONCE
+from .parallel import ParallelSolution, get_walker, parallel_search
+
+
+class _Best:
+    """Best length of an in-process search, stands in for the shared multiprocessing.Value."""
+
+    def __init__(self, value):
+        self.value = value
+
+
+class _Deadline:
+    """Stop event of an in-process search, set once the time budget is used up."""
+
+    def __init__(self, time_budget):
+        self.deadline = None if time_budget is None else time.monotonic() + time_budget
+
+    def is_set(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+
+class Sampler:
+    """Shared interface of the samplers on a compiled graph.
+
+    A sampler holds the graph, the rule (EDGES_ONCE, NODES_ONCE or EDGES_K_TIMES)
+    and the options of its walk function (see get_walker). walk() is the walker
+    generator itself, search() runs it for a time budget, a move budget or up to a
+    target length, in this process or on several worker processes, and returns the
+    reported solutions like parallel_search. The walk of search() only depends on the seed: one worker in this
+    process walks exactly like worker 0 of parallel_search with the 'pcg64' generator.
+    rules are the rules the walk supports, a sampler under another one raises ValueError,
+    like an option that is no parameter of the walk function (see check_options).
+    """
+
+    name = None
+    defaults = {}
+    rules = (EDGES_ONCE, NODES_ONCE, EDGES_K_TIMES)
+
+    # Parameters of the walk function that walk() and search() set themselves (with_moves
+    # changes what the walk yields)
+    reserved = ('graph', 'minimum_steps', 'rule', 'rng', 'best', 'stop', 'max_moves', 'with_moves')
+
+    def __init__(self, graph, rule=EDGES_ONCE, **options):
+        if rule not in self.rules:
+            raise ValueError(f"The {self.name} sampler supports the rules {', '.join(map(repr, self.rules))}, "
+                             f"not {rule!r}")
+        self.check_options(options)
+        self.graph = graph
+        self.rule = rule
+        self.options = {**self.defaults, **options}
+
+    def __repr__(self):
+        return f"{type(self).__name__}(rule={self.rule!r}, {self.options})"
+
+    # Check the names of options against the parameters of the walk function, raises ValueError
+    # naming the first unknown one
+    @classmethod
+    def check_options(cls, options):
+        parameters = [name for name in inspect.signature(get_walker(cls.name)).parameters
+                      if name not in cls.reserved]
+        for key in options:
+            if key not in parameters:
+                raise ValueError(f"The {cls.name} sampler has no option {key!r}, expected one of "
+                                 f"{', '.join(parameters)}")
+
+    # The walker generator, yields (path, all_traversed_nodes_path, edge_path) of the solutions
+    def walk(self, minimum_steps=0, rng=random, **kwargs):
+        return get_walker(self.name)(self.graph, minimum_steps, rule=self.rule, rng=rng,
+                                     **{**self.options, **kwargs})
+
+    # Search the longest solution, returns the list of reported solutions (ParallelSolution), longest last
+    #
+    # time_budget, max_moves, target_steps: stop after that many seconds, after that many
+    #                                       attempted moves (of every worker) or at a solution of that length
+    # workers: number of worker processes, 1 walks in this process
+    # seed: master seed of the PCG64 streams (see chilly/streams.py)
+    def search(self, minimum_steps=0, time_budget=None, max_moves=None, target_steps=None, workers=1, seed=0):
+        if workers > 1:
+            return parallel_search(self.graph, self.name, minimum_steps, workers, seed, target_steps, time_budget,
+                                   max_moves, generator='pcg64', rule=self.rule, **self.options)
+        if target_steps is None and time_budget is None and max_moves is None:
+            raise ValueError("search needs a target_steps, time_budget or max_moves to stop")
+
+        from .streams import worker_stream
+        best = _Best(minimum_steps - 1)
+        solutions = []
+        for path, all_traversed_nodes_path, edge_path in self.walk(minimum_steps, rng=worker_stream(seed, 0),
+                                                                   best=best, stop=_Deadline(time_budget),
+                                                                   max_moves=max_moves):
+            if len(edge_path) <= best.value:
+                continue
+            best.value = len(edge_path)
+            solutions.append(ParallelSolution(0, seed, edge_path, len(solutions)))
+            if target_steps is not None and len(edge_path) >= target_steps:
+                break
+        return solutions
+
+
+class BruteForceSampler(Sampler):
+    """Brute force Monte Carlo (see chilly/brute_force.py), options e.g. prune_dead."""
+
+    name = 'brute_force'
+
+
+class UmbrellaSampler(Sampler):
+    """Umbrella sampling with the harmonic bias around L0 (see chilly/umbrella.py), needs NumPy."""
+
+    name = 'umbrella'
+    defaults = {'verbose': False}
+
+
+class IBISampler(Sampler):
+    """Iterative Boltzmann Inversion (see chilly/ibi.py), needs NumPy."""
+
+    name = 'ibi'
+    defaults = {'verbose': False}
+
+
+class WangLandauSampler(Sampler):
+    """Wang-Landau flat histogram sampling (see chilly/wang_landau.py)."""
+
+    name = 'wang_landau'
+    defaults = {'verbose': False}
+
+
+class ExitGuidedSampler(Sampler):
+    """Exit guided walk with splice moves (see chilly/exit_guided.py)."""
+
+    name = 'exit_guided'
+
+
+class PERMSampler(Sampler):
+    """Pruned-enriched Rosenbluth chain growth (see chilly/perm.py), rule edge once or node once."""
+
+    name = 'perm'
+    defaults = {'verbose': False}
+    rules = (EDGES_ONCE, NODES_ONCE)
+
+
+# Sampler classes by name, the names of get_walker
+SAMPLERS = {sampler.name: sampler for sampler in (BruteForceSampler, UmbrellaSampler, IBISampler,
+                                                  WangLandauSampler, ExitGuidedSampler, PERMSampler)}
@@ -0,0 +1,91 @@
+import hashlib
+import heapq
+import json
+from collections import namedtuple
+
+# One line of the solution log: direction string and length of the path, the move of the
+# walker that hit it, its position in the stream of solutions of the walker (duplicates
+# included) and the seed of the walker
+LoggedSolution = namedtuple('LoggedSolution', ['directions', 'length', 'move', 'hit', 'seed'])
+
+
+class SolutionLog:
+    """Newline delimited JSON log of the distinct solutions, with the longest top_k kept in memory."""
+
+    def __init__(self, path, top_k=10):
+        self.path = path
+        self.top_k = top_k
+        self.seen = set()  # Digests of the logged direction strings
+        self.best = []  # Min heap of (length, directions) of the longest top_k solutions
+        self.duplicates = 0
+
+        # Continue an existing log, its solutions count as seen (the fields missing in the lines
+        # of older logs are None)
+        try:
+            with open(path) as file:
+                for line in file:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._remember(LoggedSolution(*(entry.get(field) for field in LoggedSolution._fields)))
+        except FileNotFoundError:
+            pass
+        self.file = open(path, 'a')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    # From the start node the direction string fixes the path, so it is the key of a solution
+    @staticmethod
+    def digest(directions):
+        return hashlib.blake2b(directions.encode(), digest_size=8).digest()
+
+    def __len__(self):
+        return len(self.seen)
+
+    def __contains__(self, directions):
+        return self.digest(directions) in self.seen
+
+    def _remember(self, solution):
+        self.seen.add(self.digest(solution.directions))
+        entry = (solution.length, solution.directions)
+        if len(self.best) < self.top_k:
+            heapq.heappush(self.best, entry)
+        elif entry > self.best[0]:
+            heapq.heapreplace(self.best, entry)
+
+    # Append a solution if it is new (written and flushed at once), returns the
+    # LoggedSolution or None for a duplicate
+    def add(self, directions, move=None, hit=None, seed=None):
+        if directions in self:
+            self.duplicates += 1
+            return None
+        solution = LoggedSolution(directions, len(directions), move, hit, seed)
+        self._remember(solution)
+        self.file.write(json.dumps(solution._asdict()) + '\n')
+        self.file.flush()
+        return solution
+
+    # The longest top_k solutions as (length, directions), longest first
+    def top(self):
+        return sorted(self.best, reverse=True)
+
+
+# Function to log every solution of a walk, the walk keeps sampling after a hit
+#
+# solutions: a walker generator, e.g. brute_force_walk(graph, minimum_steps, rng=random.Random(seed),
+# with_moves=True) without best, so it yields every solution it passes with the move that hit it
+# (the move is None for the walkers without with_moves). Yields the new LoggedSolution
+# entries while the walk goes on, stop it with max_moves or stop of the walker.
+def stream_solutions(graph, solutions, log, seed=None):
+    for hit, found in enumerate(solutions):
+        edge_path = found[2]
+        move = found[3] if len(found) > 3 else None
+        solution = log.add(graph.edge_directions(edge_path), move, hit, seed)
+        if solution is not None:
+            yield solution
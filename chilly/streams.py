@@ -0,0 +1,78 @@
+from itertools import chain, islice
+
+import numpy as np
+
+
+class BlockRandom:
+    """Random stream for the walkers, drawn in blocks from a NumPy PCG64 generator.
+
+    It offers the part of random.Random the walkers use (random, choice, randrange,
+    getstate and setstate), peek and advance hand a stretch of the stream to the
+    compiled move loop (see chilly/jit.py). The doubles are generated block_size
+    at a time and random() is the C level __next__ of an iterator over them, so a
+    move costs no Python level call into the generator. The stream only depends on the seed
+    (or on the bit generator, e.g. a jumped one, see worker_stream). Without a
+    seed a fresh one is drawn from the operating system and kept in seed, to
+    repeat the run with it.
+    """
+
+    def __init__(self, seed=None, block_size=1 << 16, bit_generator=None):
+        if bit_generator is None:
+            if seed is None:
+                seed = np.random.SeedSequence().entropy
+            bit_generator = np.random.PCG64(seed)
+        self.seed = seed
+        self.bit_generator = bit_generator
+        self.generator = np.random.Generator(self.bit_generator)
+        self.block_size = block_size
+        self._start()
+
+    # Start drawing at the current state of the bit generator
+    def _start(self, skip=0):
+        self.block_state = self.bit_generator.state
+        self.block = iter(self.generator.random(self.block_size).tolist())
+        next(islice(self.block, skip, skip), None)  # Skip the doubles already used
+        self.random = chain.from_iterable(chain([self.block], self._blocks())).__next__
+
+    # Blocks after the first one, the state before every block is kept for getstate
+    def _blocks(self):
+        while True:
+            self.block_state = self.bit_generator.state
+            self.block = iter(self.generator.random(self.block_size).tolist())
+            yield self.block
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+    def randrange(self, stop):
+        return int(self.random() * stop)
+
+    # Next count doubles of the stream as NumPy array, without using them up (see advance)
+    def peek(self, count):
+        bit_generator = type(self.bit_generator)()
+        bit_generator.state = self.block_state
+        used = self.block_size - self.block.__length_hint__()
+        return np.random.Generator(bit_generator).random(used + count)[used:]
+
+    # Use up count doubles, e.g. the ones of peek a compiled walker took (one double is one step of the bit generator)
+    def advance(self, count):
+        position = self.block_size - self.block.__length_hint__() + count
+        self.bit_generator.state = self.block_state
+        self.bit_generator.advance(position - position % self.block_size)
+        self._start(position % self.block_size)
+
+    # State: bit generator state before the current block and the number of doubles used from it
+    def getstate(self):
+        return {'block_state': self.block_state, 'block_size': self.block_size,
+                'used': self.block_size - self.block.__length_hint__()}
+
+    def setstate(self, state):
+        self.bit_generator.state = state['block_state']
+        self.block_size = state['block_size']
+        self._start(state['used'])
+
+
+# Function to create the stream of a parallel worker: PCG64 of the master seed jumped
+# ahead by (worker + 1) * 2^127 steps, so the streams of the workers never overlap
+def worker_stream(master_seed, worker, block_size=1 << 16):
+    return BlockRandom(bit_generator=np.random.PCG64(master_seed).jumped(worker + 1), block_size=block_size)
@@ -0,0 +1,97 @@
+import json
+import signal
+import sys
+import time
+from collections import Counter
+
+
+class Telemetry:
+    """Counters of a walk, written as one JSON line every interval seconds.
+
+    The walkers report the counts of every block of moves with block(); the
+    counts are summed until the interval is over and then written together
+    with the moves per second of the interval, the longest path (max_depth),
+    the current path length and the sampler state passed as extra (e.g. the
+    IBI iteration). An optional profiler (see SamplingProfiler) adds the most
+    frequent source lines of the interval to the record.
+    """
+
+    def __init__(self, file=None, interval=10.0, profiler=None):
+        self.file = file if file is not None else sys.stderr
+        self.interval = interval
+        self.profiler = profiler
+        self.records = 0
+        self._reset(time.perf_counter())
+
+    def _reset(self, now):
+        self.begin = now
+        self.counts = Counter()
+        self.max_depth = 0
+
+    # Add the counts of one block, written once the interval is over
+    def block(self, walker, moves, length, max_depth, extra=None, **counts):
+        self.counts.update(counts)
+        self.max_depth = max(self.max_depth, max_depth)
+        self.walker = walker
+        self.moves = moves
+        self.length = length
+        self.extra = extra
+        if time.perf_counter() - self.begin >= self.interval:
+            self.flush()
+
+    # Write the counts since the last record (if any)
+    def flush(self):
+        if not self.counts:
+            return
+        now = time.perf_counter()
+        seconds = now - self.begin
+        record = {'walker': self.walker, 'time': time.time(), 'moves': self.moves, **self.counts,
+                  'max_depth': self.max_depth, 'length': self.length, 'seconds': round(seconds, 6),
+                  'moves_per_second': round(self.counts['attempted'] / seconds) if seconds > 0 else None}
+        if self.extra:
+            record.update(self.extra)
+        if self.profiler is not None:
+            record['profile'] = self.profiler.take()
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+        self.records += 1
+        self._reset(now)
+
+
+class SamplingProfiler:
+    """Statistical profiler: samples the running source line every interval seconds of CPU time.
+
+    Uses the SIGPROF interval timer (Unix, main thread only). take() returns the
+    top most frequent 'file:line function' samples since the last call, as share
+    of all samples.
+    """
+
+    def __init__(self, interval=0.001, top=10):
+        self.interval = interval
+        self.top = top
+        self.samples = Counter()
+
+    def _sample(self, signum, frame):
+        code = frame.f_code
+        self.samples[f"{code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno} {code.co_name}"] += 1
+
+    def start(self):
+        signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        return self
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def take(self):
+        total = sum(self.samples.values())
+        top = {line: round(count / total, 4) for line, count in self.samples.most_common(self.top)}
+        self.samples.clear()
+        return top
@@ -0,0 +1,137 @@
+import math
+import random
+from itertools import accumulate
+
+import numpy as np
+
+from .checkpoint import check_checkpoint, graph_arrays, load_checkpoint, restore_rng, rng_arrays, save_checkpoint
+from .core import Bias, Walker
+from .graph import NODES_ONCE
+
+# Harmonic umbrella potential over the path length
+def bias(L, L0, k):
+    return 0.5 * k * (L - L0)**2
+
+
+class UmbrellaBias(Bias):
+    """Harmonic umbrella bias(L, L0, k) over the path length, for the Walker (see chilly/core.py).
+
+    A move is taken with the Metropolis probability of the bias between
+    tmp_path_length (the length before the last taken move, or after the last
+    reverse) and the current length, the lengths after every forward attempt go
+    to the histogram counts.
+
+    Only the growing moves uphill are ever rejected, so a path of length L is
+    sampled with roughly the weight exp(-(sum of the uphill steps of the bias
+    up to L)), the log_weights the bulk moves aim at. Roughly, as tmp_path_length
+    lags one move behind after a taken move.
+    """
+
+    def __init__(self, size, L0, k):
+        self.table = [bias(L, L0, k) for L in range(size)]
+        # Acceptance exp(-deltaU) of growing by one from every length
+        self.grow_accept = [1.0] + [math.exp(min(self.table[L - 1] - self.table[L], 0.0)) for L in range(1, size)]
+        self.log_weights = list(accumulate((min(self.table[L - 1] - self.table[L], 0.0) for L in range(1, size)),
+                                           initial=0.0))
+        self.counts = [0] * size
+        self.tmp_path_length = 1
+
+    def log_weight(self, length):
+        return self.log_weights[length]
+
+    # The bulk move counts like a forward attempt, the lengths go on from the current one
+    def after_bulk(self, walker):
+        self.tmp_path_length = walker.length
+        self.counts[walker.length] += 1
+
+    # Hooks of the move loop of the Walker (see chilly/core.py)
+    def forward_accept(self, walker, next_edge, valid_moves):
+        # try the new path
+        tmp_new_path_length = len(walker.edge_path)
+        tmp_path_length = self.tmp_path_length
+
+        # deltaU is zero after a reverse move and the step from L-1 to L after a move, looked up in grow_accept
+        if tmp_new_path_length == tmp_path_length:
+            accept = 1.0
+        elif tmp_new_path_length == tmp_path_length + 1:
+            accept = self.grow_accept[tmp_new_path_length]
+        else:
+            accept = math.exp(min(self.table[tmp_path_length] - self.table[tmp_new_path_length], 0.0))
+
+        if accept >= 1.0 or walker.rng.random() < accept:
+            self.tmp_path_length = tmp_new_path_length
+            self.counts[tmp_new_path_length] += 1
+            return True
+        self.counts[tmp_path_length] += 1
+        return False
+
+    def backward_accept(self, walker, last_edge, valid_moves):
+        self.tmp_path_length = len(walker.edge_path) - 1
+        return True
+
+
+# Monte Carlo walk with Umbrella Sampling on the compiled graph
+#
+# The brute force dynamics of brute_force_walk, but every move is accepted
+# only with the Metropolis probability of the harmonic bias(L, L0, k) that
+# pushes the walker to path lengths around L0 (the Walker of chilly/core.py
+# with an UmbrellaBias). The histogram of the path lengths is printed every
+# sweeps_per_check moves if verbose is set.
+# Solutions are yielded like in brute_force_walk, rng, best, stop, max_moves and
+# max_uses have the same meaning (stop is checked every sweeps_per_check moves).
+# checkpoint, checkpoint_interval (in blocks of sweeps_per_check moves) and resume
+# write and continue the walk with its histogram like in ibi_walk.
+# telemetry: Telemetry (see chilly/telemetry.py) that gets the counters of every block
+#            like in brute_force_walk, with the moves rejected by the bias
+# bulk_moves: bulk moves of chilly/bulk.py like in brute_force_walk
+# jit: the compiled move loop like in brute_force_walk
+def umbrella_walk(graph, minimum_steps, rule=NODES_ONCE, L0=33, k=0.005, sweeps_per_check=100000,
+                  rng=random, best=None, stop=None, max_moves=None, verbose=True, checkpoint=None,
+                  checkpoint_interval=1, resume=False, telemetry=None, max_uses=2, bulk_moves=None, jit=False):
+    walker = Walker(graph, rule, rng=rng, max_uses=max_uses, bulk_moves=bulk_moves, jit=jit)
+
+    # Bias and histogram over the path length, sized to the longest possible path
+    size = walker.max_length + 2
+    walker.bias = umbrella = UmbrellaBias(size, L0, k)
+    hist = np.zeros(size, dtype=np.int64)
+
+    moves = 0
+    blocks = 0
+
+    # Continue from the last checkpoint: path, counters, histogram and random stream
+    state = load_checkpoint(checkpoint) if checkpoint is not None and resume else None
+    if state is not None:
+        check_checkpoint(state, 'umbrella', graph)
+        walker.reset(state['edge_path'].tolist())
+        umbrella.tmp_path_length = int(state['tmp_path_length'])
+        blocks = int(state['blocks'])
+        moves = int(state['moves'])
+        hist = state['hist']
+        restore_rng(rng, state)
+
+    while max_moves is None or moves < max_moves:
+        if stop is not None and stop.is_set():
+            return
+        if verbose:
+            print(hist[:np.flatnonzero(hist).max(initial=0) + 1])
+        umbrella.counts = [0] * size
+        sweeps = sweeps_per_check if max_moves is None else min(sweeps_per_check, max_moves - moves)
+        moves += sweeps
+
+        solutions = walker.run(sweeps, minimum_steps, best)
+        hist += umbrella.counts
+        blocks += 1
+
+        if telemetry is not None:
+            telemetry.block('umbrella', moves, walker.length, walker.max_depth, **walker.block_counts)
+
+        # Write the full sampler state at the end of the block
+        if checkpoint is not None and blocks % checkpoint_interval == 0:
+            save_checkpoint(checkpoint, **graph_arrays('umbrella', graph), **rng_arrays(rng),
+                            edge_path=np.array(walker.edge_path, dtype=np.int32),
+                            tmp_path_length=umbrella.tmp_path_length, blocks=blocks, moves=moves, hist=hist)
+
+        for path, all_traversed_nodes_path, edge_path in solutions:
+            # The shared best one may have grown since the solution was hit
+            if best is None or len(edge_path) > best.value:
+                yield path, all_traversed_nodes_path, edge_path
@@ -0,0 +1,156 @@
+import math
+import random
+
+from .core import Bias, Walker
+from .graph import EDGES_ONCE
+
+
+class WangLandau(Bias):
+    """Wang-Landau flat histogram sampler over the path length L.
+
+    It is the bias of its Walker (see chilly/core.py), which makes the grow
+    and reverse moves of brute_force_walk, a move
+    from length L to L' is accepted with the probability
+    min(1, g(L)/g(L') * (n+1)/(n'+1)), where n and n' are the numbers of valid
+    moves before and after the move (the Hastings correction of the backtracking
+    proposal). After every move ln g(L) += ln_f for the current length. Once the
+    histogram of the current stage is flat (every length seen so far has at least
+    flatness * mean entries) ln_f is halved and the histogram is reset. Below
+    ln_f_final the estimate is converged and frozen.
+
+    With ln g(0) = 0 (the empty path), exp(ln g(L)) estimates the number of
+    walks of L steps from the start under the rule (see path_counts). A length
+    seen for the first time starts at ln g = 0, far below the lengths seen
+    before, which pushes the walker to ever longer paths, the estimate is only
+    reliable once the new lengths have caught up over a few flat stages.
+    """
+
+    def __init__(self, graph, rule=EDGES_ONCE, ln_f=1.0, ln_f_final=1e-6, flatness=0.8, rng=random, max_uses=2,
+                 bulk_moves=None):
+        self.graph = graph
+        self.rng = rng
+        self.walker = Walker(graph, rule, self, rng, max_uses=max_uses, bulk_moves=bulk_moves)
+        self.ln_f = ln_f
+        self.ln_f_final = ln_f_final
+        self.flatness = flatness
+        self.stage = 0
+
+        # Every edge is taken at most once (or max_uses times), so L <= max_length of the walker
+        self.ln_g = [0.0] * (self.walker.max_length + 1)
+        self.hist = [0] * (self.walker.max_length + 1)
+        self.max_length = 0  # Longest length seen so far, all lengths below are seen too
+
+        # ln(n + 1) for n valid moves, the Hastings correction of the backtracking proposal
+        max_degree = max((graph.offsets[n + 1] - graph.offsets[n] for n in range(graph.num_nodes)), default=0)
+        self.log_choices = [math.log(n + 1) for n in range(max_degree + 1)]
+
+        # Counters of the last run, for the telemetry
+        self.block_counts = {}
+
+    # Hooks of the move loop of the Walker (see chilly/core.py), the moves are taken or
+    # given back in the visited slots already, so the valid moves after them are the ones
+    # the walker would see
+    def forward_accept(self, walker, next_edge, valid_moves):
+        length = len(walker.edge_path)
+        next_moves = walker.valid_edges(walker.graph.targets[next_edge])
+        ln_accept = (self.ln_g[length] - self.ln_g[length + 1]
+                     + self.log_choices[len(valid_moves)] - self.log_choices[len(next_moves)])
+        return ln_accept >= 0 or walker.rng.random() < math.exp(ln_accept)
+
+    def backward_accept(self, walker, last_edge, valid_moves):
+        length = len(walker.edge_path)
+        previous_moves = walker.valid_edges(walker.path[-2])
+        ln_accept = (self.ln_g[length] - self.ln_g[length - 1]
+                     + self.log_choices[len(valid_moves)] - self.log_choices[len(previous_moves)])
+        return ln_accept >= 0 or walker.rng.random() < math.exp(ln_accept)
+
+    def after_move(self, walker):
+        # Update the density of states and the histogram at the length after the move
+        if not self.converged:
+            self.ln_g[len(walker.edge_path)] += self.ln_f
+        self.hist[len(walker.edge_path)] += 1
+
+    # With the Hastings correction the walk samples L with the weight 1/g(L), whatever the valid moves
+    choice_weighted = False
+
+    def log_weight(self, length):
+        return -self.ln_g[length]
+
+    # The bulk move updates the density of states like every single move
+    def after_bulk(self, walker):
+        if not self.converged:
+            self.ln_g[walker.length] += self.ln_f
+        self.hist[walker.length] += 1
+
+    @property
+    def length(self):
+        return self.walker.length
+
+    @property
+    def converged(self):
+        return self.ln_f < self.ln_f_final
+
+    # Perform a number of moves, return the edge paths of all solutions hit on the way
+    def run(self, moves, minimum_steps):
+        solutions = self.walker.run(moves, minimum_steps)
+        self.max_length = max(self.max_length, self.walker.max_depth)
+        self.block_counts = self.walker.block_counts
+        return [edge_path for path, all_traversed_nodes_path, edge_path in solutions]
+
+    # Check the flatness of the histogram over the lengths seen so far,
+    # on a flat histogram go to the next stage with half the modification factor
+    def check_flatness(self):
+        if self.converged:
+            return False
+        hist = self.hist[:self.max_length + 1]
+        if min(hist) < self.flatness * sum(hist) / len(hist):
+            return False
+        self.ln_f /= 2.0
+        self.hist = [0] * len(self.hist)
+        self.stage += 1
+        return True
+
+    # Estimated ln g(L) for the lengths seen so far, normalized to ln g(0) = 0
+    def ln_g_estimate(self):
+        return [value - self.ln_g[0] for value in self.ln_g[:self.max_length + 1]]
+
+    # Estimated number of walks of every length seen so far
+    def path_counts(self):
+        return [math.exp(value) for value in self.ln_g_estimate()]
+
+
+# Monte Carlo walk with Wang-Landau sampling on the compiled graph
+#
+# Drop-in alternative to ibi_walk: the bias is the density of states of the
+# path length, updated after every move instead of every sweeps_per_check moves.
+# The flatness of the histogram is checked every sweeps_per_check moves. The
+# sampler is passed in to read ln g(L) while or after walking, otherwise a new
+# one is created from the options. Solutions are yielded like in brute_force_walk,
+# rng, best, stop, max_moves and max_uses have the same meaning. telemetry gets the counters of
+# every block like in brute_force_walk (max_depth is the longest length seen so far)
+# with the stage and ln_f of the sampler. bulk_moves adds the bulk moves of
+# chilly/bulk.py like in brute_force_walk.
+def wang_landau_walk(graph, minimum_steps, rule=EDGES_ONCE, ln_f=1.0, ln_f_final=1e-6, flatness=0.8,
+                     sweeps_per_check=100000, rng=random, best=None, stop=None, max_moves=None,
+                     verbose=True, sampler=None, telemetry=None, max_uses=2, bulk_moves=None):
+    if sampler is None:
+        sampler = WangLandau(graph, rule, ln_f, ln_f_final, flatness, rng, max_uses, bulk_moves)
+
+    moves = 0
+    while max_moves is None or moves < max_moves:
+        if stop is not None and stop.is_set():
+            return
+        sweeps = sweeps_per_check if max_moves is None else min(sweeps_per_check, max_moves - moves)
+        moves += sweeps
+
+        for edge_path in sampler.run(sweeps, minimum_steps):
+            # Check if the path beats the shared best one
+            if best is None or len(edge_path) > best.value:
+                yield graph.nodes_of(edge_path), graph.cells_of(edge_path), edge_path
+
+        if telemetry is not None:
+            telemetry.block('wang_landau', moves, sampler.length, sampler.max_length,
+                            extra={'stage': sampler.stage, 'ln_f': sampler.ln_f}, **sampler.block_counts)
+
+        if sampler.check_flatness() and verbose:
+            print('stage', sampler.stage, 'ln_f', sampler.ln_f, 'max length', sampler.max_length)
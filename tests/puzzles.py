@@ -0,0 +1,59 @@
+from chilly import compile_graph, create_graph, find_eggs, find_exit, find_player, replace_wormhole_destinations
+
+# The playfields of the puzzle scripts: grid rows and wormhole mapping
+PUZZLES = {
+    'Puzzle1': (
+        [
+            '###YY#T#',
+            'X $YO$ P',
+            'T      T',
+            'Y   T  Y',
+            'TO    TY',
+            '#T$    #',
+            'Y  T$ OT',
+            'YTY#TT##',
+        ],
+        {'(4, 1)': '(1, 4)', '(1, 4)': '(6, 6)', '(6, 6)': '(4, 1)'},
+    ),
+    'Puzzle2': (
+        [
+            'OY #    $ Y$Y',
+            ' X          Y',
+            '  T # T   $O ',
+            ' T       T  T',
+            '#Y   #  TT# #',
+            'Y T $    Y ##',
+            '      Y T $  ',
+            'TT   Y  Y#Y T',
+            ' $ #    # $  ',
+            '  $ # Y   T  ',
+            'T    T     P#',
+            '  Y $  Y T  Y',
+        ],
+        {'(0, 0)': '(2, 11)', '(2, 11)': '(0, 0)'},
+    ),
+    'Puzzle3': (
+        [
+            'OY T    $ Y$Y',
+            ' X          Y',
+            '  T # T   $O ',
+            ' T       T  T',
+            '#Y   #  TT# T',
+            'Y T $    Y ##',
+            '      Y T $  ',
+            'TT   Y  Y#Y T',
+            ' $ #    # $T ',
+            '  $ # Y   T  ',
+            'T    T     P#',
+            '  Y $  Y T  Y',
+        ],
+        {'(0, 0)': '(2, 11)', '(2, 11)': '(0, 0)'},
+    ),
+}
+
+
+# Function to compile the graph of a puzzle like the scripts do
+def compiled_puzzle(name):
+    data, wormhole_mapping = PUZZLES[name]
+    graph = replace_wormhole_destinations(create_graph(data), wormhole_mapping)
+    return compile_graph(graph, find_player(data), find_exit(data), find_eggs(data))
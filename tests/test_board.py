@@ -0,0 +1,40 @@
+import json
+import os
+
+import pytest
+
+from chilly import parse_board
+from chilly.__main__ import main
+
+BOARDS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'boards')
+
+
+# The errors name the board and the line of the grid (or of the row)
+@pytest.mark.parametrize('text, message', [
+    ("rule: edge-once\n|X# #|\n|  # |\n", "board.txt:2: the board has no player 'P'"),
+    ("# no exit\n\n|P# #|\n|  # |\n", "board.txt:3: the board has no exit 'X'"),
+    ("|X# P|\n\n|    |\n|####|\n", "board.txt:3: row 1 has no obstacle"),
+    ("|X# P|\n| #  |\n", "board.txt:1: column 2 has no obstacle"),
+])
+def test_parse_board_errors(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_board(text, 'board.txt')
+
+
+# A directory with broken boards: every board is searched or reported, the exit status is 1
+def test_directory_skips_bad_boards(tmp_path, capsys):
+    with open(os.path.join(BOARDS, 'Puzzle1.txt')) as file:
+        (tmp_path / 'a.txt').write_text(file.read())
+    (tmp_path / 'b.txt').write_text("|X  P|\n|    |\n|####|\n")
+    (tmp_path / 'c.json').write_text('{"data": [')
+    (tmp_path / 'd.txt').write_text("|X#P|\n|##T|\n")
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(tmp_path), '--max-moves', '1000', '--no-cache', '--json'])
+    assert exit_info.value.code == 1
+
+    out, err = capsys.readouterr()
+    assert [json.loads(line)['board'] for line in out.splitlines()] == [str(tmp_path / 'a.txt'),
+                                                                        str(tmp_path / 'd.txt')]
+    assert err.splitlines() == [f"python -m chilly: error: {tmp_path / 'b.txt'}:2: row 1 has no obstacle, "
+                                f"exit or wormhole, a slide along it never stops",
+                                f"python -m chilly: error: {tmp_path / 'c.json'}:1: Expecting value"]
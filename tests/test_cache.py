@@ -0,0 +1,37 @@
+import pickle
+
+import pytest
+
+from chilly.cache import load_graph, open_graph, save_graph
+
+from puzzles import PUZZLES, compiled_puzzle
+
+
+def assert_same_graph(graph, other):
+    assert graph.num_nodes == other.num_nodes
+    assert list(graph.offsets) == list(other.offsets)
+    assert list(graph.targets) == list(other.targets)
+    assert [list(table) for table in graph.tables()] == [list(table) for table in other.tables()]
+    assert graph.set_bits == other.set_bits
+    assert graph.payloads == other.payloads
+
+
+# A cached graph comes back with its derived tables and payloads, also after pickling
+@pytest.mark.parametrize('name', sorted(PUZZLES))
+def test_cached_graph_matches_compiled(name, tmp_path):
+    graph = compiled_puzzle(name)
+    save_graph(graph, tmp_path / 'graph')
+    cached = open_graph(tmp_path / 'graph')
+    assert_same_graph(graph, cached)
+    assert list(cached.distances_to(cached.exit)) == list(graph.distances_to(graph.exit))
+    assert_same_graph(graph, pickle.loads(pickle.dumps(cached)))
+
+
+# The second load of a board maps the file written by the first one
+def test_load_graph_writes_and_maps(tmp_path):
+    data, wormhole_mapping = PUZZLES['Puzzle1']
+    graph = load_graph(data, wormhole_mapping, tmp_path)
+    assert not hasattr(graph, 'mapped_file')
+    cached = load_graph(data, wormhole_mapping, tmp_path)
+    assert hasattr(cached, 'mapped_file')
+    assert_same_graph(graph, cached)
@@ -0,0 +1,42 @@
+import random
+
+import numpy as np
+import pytest
+
+from chilly import EDGES_ONCE
+from chilly.checkpoint import load_checkpoint
+from chilly.ibi import ibi_walk
+from chilly.umbrella import umbrella_walk
+
+from puzzles import compiled_puzzle
+
+BLOCK = 5000  # Moves between two checkpoints
+
+
+def walk(sampler, graph, max_moves, checkpoint, resume=False, seed=11):
+    if sampler == 'ibi':
+        return ibi_walk(graph, 0, EDGES_ONCE, sweeps_per_check=BLOCK, rng=random.Random(seed), max_moves=max_moves,
+                        verbose=False, checkpoint=checkpoint, resume=resume)
+    return umbrella_walk(graph, 0, EDGES_ONCE, L0=20, sweeps_per_check=BLOCK, rng=random.Random(seed),
+                         max_moves=max_moves, verbose=False, checkpoint=checkpoint, resume=resume)
+
+
+# Save, load and resume: the walk goes on with the same solutions and ends in the same state
+# as the walk that ran through
+@pytest.mark.parametrize('sampler', ['ibi', 'umbrella'])
+def test_resume_repeats_the_walk(tmp_path, sampler):
+    graph = compiled_puzzle('Puzzle1')
+    through = str(tmp_path / 'through.npz')
+    resumed = str(tmp_path / 'resumed.npz')
+
+    expected = [edge_path for _, _, edge_path in walk(sampler, graph, 8 * BLOCK, through)]
+    first = [edge_path for _, _, edge_path in walk(sampler, graph, 3 * BLOCK, resumed)]
+    # Another seed: the random stream has to come from the checkpoint
+    rest = [edge_path for _, _, edge_path in walk(sampler, graph, 8 * BLOCK, resumed, resume=True, seed=12)]
+    assert expected
+    assert first + rest == expected
+
+    state, other = load_checkpoint(through), load_checkpoint(resumed)
+    assert state.keys() == other.keys()
+    for key in state:
+        np.testing.assert_array_equal(state[key], other[key])
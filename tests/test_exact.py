@@ -0,0 +1,35 @@
+import pytest
+
+from chilly import EDGES_ONCE, NODES_ONCE
+from chilly.exact import longest_path
+
+from puzzles import compiled_puzzle
+
+
+# Proven optima of the puzzles, see Chilly_Exact_Puzzle1_OnlyEdgesOnce.py and Chilly_Exact_Puzzle2_OnlyNodesOnce.py
+@pytest.mark.parametrize('name, rule, optimum', [('Puzzle1', EDGES_ONCE, 32), ('Puzzle2', NODES_ONCE, 40)])
+def test_longest_path_optimum(name, rule, optimum):
+    graph = compiled_puzzle(name)
+    result = longest_path(graph, rule)
+    assert result.proven
+    assert result.length == optimum == len(result.edges)
+
+    # The edges are a solution under the rule: a walk from the start to the exit over
+    # distinct edges (or into distinct nodes) that collects every egg
+    node = graph.start
+    eggs = 0
+    for e in result.edges:
+        assert graph.sources[e] == node
+        node = graph.targets[e]
+        eggs |= graph.payloads[e].egg_mask
+    assert node == graph.exit
+    assert eggs == (1 << len(graph.eggs)) - 1
+    slots = result.edges if rule == EDGES_ONCE else [graph.targets[e] for e in result.edges]
+    assert len(set(slots)) == len(slots)
+
+
+# Nothing beats the optimum
+def test_longest_path_above_optimum():
+    result = longest_path(compiled_puzzle('Puzzle1'), EDGES_ONCE, lower_bound=33)
+    assert result.proven
+    assert result.length is None and result.edges == []
@@ -0,0 +1,21 @@
+import random
+
+import pytest
+
+from chilly.graph import create_graph, create_graph_by_rays
+from chilly.playfield import random_playfield
+
+from puzzles import PUZZLES
+
+
+# The sweep line construction gives the same graph as the rays, edges in the same order
+@pytest.mark.parametrize('name', sorted(PUZZLES))
+def test_sweep_line_matches_rays(name):
+    data, wormhole_mapping = PUZZLES[name]
+    assert create_graph(data) == create_graph_by_rays(data)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_sweep_line_matches_rays_on_random_playfields(seed):
+    data, wormhole_mapping = random_playfield(17, 23, obstacle_density=0.3, wormholes=2, rng=random.Random(seed))
+    assert create_graph(data) == create_graph_by_rays(data)
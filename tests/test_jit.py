@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from chilly import EDGES_ONCE, NODES_ONCE, Walker
+from chilly import jit
+from chilly.ibi import IBIBias
+from chilly.streams import BlockRandom
+from chilly.umbrella import UmbrellaBias
+
+from puzzles import compiled_puzzle
+
+
+def assert_same_walk(walker, other, solutions, other_solutions):
+    assert solutions == other_solutions
+    assert walker.hits == other.hits
+    assert walker.edge_path == other.edge_path
+    assert walker.path == other.path
+    assert walker.block_counts == other.block_counts
+    assert walker.rng.random() == other.rng.random()
+
+
+# The biases the move loop of chilly/jit.py knows, each walker gets its own
+def make_bias(name, walker):
+    size = walker.max_length + 2
+    if name == 'umbrella':
+        return UmbrellaBias(size, 20, 0.05)
+    if name == 'ibi':
+        return IBIBias(0.3 * np.sin(np.arange(size)), invkT=1.5)
+    return None
+
+
+# The move loop of chilly/jit.py (uncompiled, so the test runs without Numba) makes the same moves
+# as the Python loop of the Walker, block after block
+@pytest.mark.parametrize('bias', [None, 'umbrella', 'ibi'])
+@pytest.mark.parametrize('name, rule', [('Puzzle1', EDGES_ONCE), ('Puzzle3', EDGES_ONCE), ('Puzzle2', NODES_ONCE)])
+def test_python_moves_match_walker(name, rule, bias):
+    graph = compiled_puzzle(name)
+    walker = Walker(graph, rule, rng=BlockRandom(5))
+    other = Walker(graph, rule, rng=BlockRandom(5))
+    if bias is not None:
+        walker.bias = make_bias(bias, walker)
+        other.bias = make_bias(bias, other)
+    assert jit.supported(other)
+    found = 0
+    for _ in range(4):
+        solutions = walker.run(20000, 0)
+        other_solutions = jit.run(other, 20000, 0, move_loop=jit.python_moves)
+        assert_same_walk(walker, other, solutions, other_solutions)
+        if bias is not None:
+            assert walker.bias.counts == other.bias.counts
+            assert walker.bias.tmp_path_length == other.bias.tmp_path_length
+        found += len(solutions)
+    if rule == EDGES_ONCE and bias is None:  # The node once walk rarely ends at the exit that early
+        assert found
+
+
+@pytest.mark.skipif(not jit.HAVE_NUMBA, reason="Numba is not installed")
+@pytest.mark.parametrize('bias', [None, 'umbrella', 'ibi'])
+def test_compiled_moves_match_walker(bias):
+    graph = compiled_puzzle('Puzzle3')
+    walker = Walker(graph, EDGES_ONCE, rng=BlockRandom(5))
+    other = Walker(graph, EDGES_ONCE, rng=BlockRandom(5), jit=True)
+    if bias is not None:
+        walker.bias = make_bias(bias, walker)
+        other.bias = make_bias(bias, other)
+    assert_same_walk(walker, other, walker.run(50000, 0), other.run(50000, 0))
@@ -0,0 +1,36 @@
+import pytest
+
+from chilly import EDGES_K_TIMES, EDGES_ONCE, SAMPLERS
+from chilly.__main__ import main
+
+from puzzles import compiled_puzzle
+
+
+# Every sampler finds a solution on Puzzle 1 with a move budget
+@pytest.mark.parametrize('name', sorted(SAMPLERS))
+def test_search(name):
+    sampler = SAMPLERS[name](compiled_puzzle('Puzzle1'), EDGES_ONCE)
+    solutions = sampler.search(max_moves=200000, seed=3)
+    assert solutions
+    assert [len(solution.edges) for solution in solutions] == sorted(len(solution.edges) for solution in solutions)
+
+
+# Unsupported rules and unknown options are rejected when the sampler is made
+def test_rejects_rule_and_options():
+    graph = compiled_puzzle('Puzzle1')
+    with pytest.raises(ValueError, match="rules"):
+        SAMPLERS['perm'](graph, EDGES_K_TIMES)
+    with pytest.raises(ValueError, match="no option 'foo'"):
+        SAMPLERS['brute_force'](graph, EDGES_ONCE, foo=1)
+    with pytest.raises(ValueError, match="no option 'rng'"):
+        SAMPLERS['umbrella'](graph, EDGES_ONCE, rng=None)
+    SAMPLERS['brute_force'](graph, EDGES_ONCE, prune_dead=True)
+
+
+# The command line turns them into usage errors
+@pytest.mark.parametrize('arguments', [['--option', 'foo=1'], ['--sampler', 'perm', '--rule', 'edge-k-times']])
+def test_command_line_usage_errors(arguments, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(['boards/Puzzle1.txt', '--max-moves', '10'] + arguments)
+    assert exit_info.value.code == 2
+    assert 'python -m chilly: error:' in capsys.readouterr().err